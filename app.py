@@ -1,20 +1,33 @@
+import time
+appStartTime = time.perf_counter()
+
 import threading
-from texttwistgame import TextTwistGame
 from ui import TextTwistUI
 
 """
 This is the main
 creates the objects for UI and the game logic
 Starts the game loop and handles user interactions.
+The start page is shown first. The game logic is made right after the first
+frame, and its prefetcher loads the dictionary on a background thread while
+the player picks a difficulty.
 """
 
 
 def handle_thread_exceptions(*args):
     pass
 
+
+def createGame(ui):
+    # imported here so loading the game code does not delay the first frame
+    from texttwistgame import TextTwistGame
+    from scorestore import ScoreStore
+    game = TextTwistGame(scoreStore=ScoreStore())
+    ui.add_game_object_to_ui(game)
+
+
 if __name__ == "__main__":
     threading.excepthook = handle_thread_exceptions
-    ui = TextTwistUI()
-    game = TextTwistGame()
-    ui.add_game_object_to_ui(game)
-    ui.start_mainloop()
\ No newline at end of file
+    ui = TextTwistUI(appStartTime)
+    ui.afterFirstFrame(lambda: createGame(ui))
+    ui.start_mainloop()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+"""
+CPU cost of idle game sessions on the shared ClockScheduler.
+    python benchmarks/bench_clockscheduler.py --sessions 10000 --seconds 10
+Starts headless games on one scheduler, lets them count down doing nothing
+else, and reports the CPU time the process used per wall second, plus how
+late the ticks were compared to their start + k second deadlines.
+"""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clockscheduler import ClockScheduler
+from texttwistgame import TextTwistGame, RoundPrefetcher
+
+
+async def runBenchmark(sessionCount, seconds, sampleCount=50):
+    loop = asyncio.get_running_loop()
+    scheduler = ClockScheduler(loop)
+    prefetcher = RoundPrefetcher(0)
+
+    games = []
+    for i in range(sessionCount):
+        games.append(TextTwistGame(prefetcher=prefetcher, scheduler=scheduler, highScorePath=None))
+
+    # record when some of the clocks really ticked
+    lateness = []
+    startedAt = {}
+    for game in games[:sampleCount]:
+        def record(text, game=game):
+            ticks = game.clock.startTime - game.clock.getTimeLeft()
+            if game in startedAt and ticks > 0:
+                lateness.append(loop.time() - (startedAt[game] + ticks))
+        game.clock.tickListeners.append(record)
+
+    for game in games:
+        startedAt[game] = loop.time()
+        game.startGame("EASY")
+    # let the start calls run before measuring
+    await asyncio.sleep(0)
+
+    ticksBefore = scheduler.tickCount
+    cpuBefore = time.process_time()
+    wallBefore = time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpuUsed = time.process_time() - cpuBefore
+    wallUsed = time.perf_counter() - wallBefore
+    prefetcher.stop()
+
+    lateness.sort()
+    return {
+        "sessions": sessionCount,
+        "seconds": round(wallUsed, 3),
+        "ticks": scheduler.tickCount - ticksBefore,
+        "cpuMsPerSecond": round(1000 * cpuUsed / wallUsed, 3),
+        "cpuMsPerSecondPer10k": round(1000 * cpuUsed / wallUsed * 10000 / sessionCount, 3),
+        "tickLatenessMsP50": round(1000 * lateness[len(lateness) // 2], 3) if lateness else None,
+        "tickLatenessMsMax": round(1000 * lateness[-1], 3) if lateness else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    result = asyncio.run(runBenchmark(args.sessions, args.seconds))
+    for name, value in result.items():
+        print(name + ": " + str(value))
+
+
+if __name__ == "__main__":
+    main()
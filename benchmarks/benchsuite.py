@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import contextlib
+
+"""
+Benchmark suite for the word pipeline and the game hot paths.
+    python benchmarks/benchsuite.py                      run and compare with baseline.json
+    python benchmarks/benchsuite.py --update-baseline    run and save as the new baseline
+    python benchmarks/benchsuite.py --only checkWord --threshold 0.5
+
+Every case runs offline with a fixed random seed. Results are saved as JSON
+(median / min seconds per call). A case is a regression when its min is
+more than threshold slower than the baseline (0.25 = 25%). The min is used
+because other load on the machine only ever adds time, so it moves much
+less between runs than the median. Every round of a case also times a
+fixed piece of pure Python ("calibration"); when the baseline case has one
+too, the ratio is divided by how much slower that got, so a slower machine
+is not taken for a regression. Thresholds can
+also be set per case in baseline.json under "thresholds". Any regression
+makes the script exit with code 1.
+"""
+
+benchFolder = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchFolder))
+
+import words
+import wordstore
+from texttwistgame import TextTwistGame
+
+baselinePath = os.path.join(benchFolder, "baseline.json")
+defaultThreshold = 0.25
+# rounds per case, the fastest round is compared so more rounds give a steadier min
+caseRepeat = 9
+
+
+# a fixed bit of pure Python work, to see how fast the machine is right now
+def calibrationWork():
+    total = 0
+    for i in range(5000):
+        total += i * i % 7
+    return total
+
+
+# times func: `repeat` rounds of `number` calls, gives seconds per call.
+# Each round also times calibrationWork, the min of both is taken when the
+# machine was at its fastest
+def timeCase(func, number, repeat):
+    samples = []
+    calibration = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        calibrationWork()
+        calibration.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for j in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {"median": statistics.median(samples), "min": min(samples),
+            "number": number, "repeat": repeat, "calibration": min(calibration)}
+
+
+# points words.py at a copy of the word lists so builds do not touch the real ones
+class TempWordLists:
+    names = ["wordlistPath", "sourcePath", "sixLetterPath", "allWordsPath", "compiledDictionaryPath"]
+
+    def __enter__(self):
+        self.saved = {}
+        for name in self.names:
+            self.saved[name] = getattr(words, name)
+        self.folder = tempfile.mkdtemp(prefix="texttwist_bench_")
+        shutil.copy(words.sourcePath, os.path.join(self.folder, "original_wordlist.txt"))
+        words.wordlistPath = self.folder
+        words.sourcePath = os.path.join(self.folder, "original_wordlist.txt")
+        words.sixLetterPath = os.path.join(self.folder, "6letterwords.txt")
+        words.allWordsPath = os.path.join(self.folder, "allwords.txt")
+        words.compiledDictionaryPath = os.path.join(self.folder, "dictionary.bin")
+        return self
+
+    def __exit__(self, *args):
+        for name, value in self.saved.items():
+            setattr(words, name, value)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def makeCases(seed):
+    rng = random.Random(seed)
+    baseWords = []
+    for line in open(words.sixLetterPath):
+        if line.strip().isalpha():
+            baseWords.append(line.strip())
+    sampleBases = rng.sample(baseWords, 200)
+    allWords = [line.strip() for line in open(words.allWordsPath)]
+    sampleWords = rng.sample(allWords, 200)
+
+    plainStore = wordstore.loadWordStore(words.allWordsPath)
+    packedStore = wordstore.loadWordStore(words.allWordsPath, packed=True)
+
+    # one round to test the game parts on
+    game = TextTwistGame(prefetchDepth=0, autoTick=False, highScorePath=None)
+    random.seed(seed)
+    game.startGame("EASY")
+    answers = list(game.getWordList())
+    shuffledAnswers = answers[:]
+    rng.shuffle(shuffledAnswers)
+    guesses = answers + ["QQQ", "ZZZZZ"] * 5
+
+    counter = {"i": 0}
+
+    def nextItem(items):
+        counter["i"] += 1
+        return items[counter["i"] % len(items)]
+
+    def buildLists():
+        with TempWordLists():
+            words.generateWordListsFromSource()
+
+    def buildListsStreaming():
+        # the streaming build prints its speed, keep the report clean
+        with TempWordLists(), contextlib.redirect_stdout(open(os.devnull, "w")):
+            words.generateWordListsFromSource(streaming=True)
+
+    def checkWords():
+        game.round = type(game.round)(answers, len(game.gameLetters))
+        game.enteredWordsFromUser = set()
+        for word in guesses:
+            game.checkWord(word)
+
+    def startGame(baseLength=6):
+        game.resetGame()
+        game.startGame("HARD", baseLength)
+
+    # name -> (function, number, repeat)
+    cases = {
+        "generateWordListsFromSource": (buildLists, 1, 5),
+        "generateWordListsFromSource.streaming": (buildListsStreaming, 1, 5),
+        "getBaseWord.easy": (lambda: words.getBaseWord(3), 2000, caseRepeat),
+        "getBaseWord.hard": (lambda: words.getBaseWord(5), 2000, caseRepeat),
+        "getBaseWordInScoreBand": (lambda: words.getBaseWordInScoreBand(60, 80, 3), 2000, caseRepeat),
+        "generateValidWordsFromBaseWord": (lambda: words.generateValidWordsFromBaseWord(nextItem(sampleBases)), 500, caseRepeat),
+        "generateValidWordsFromBaseWord.uncached": (lambda: words.generateValidWordsFromBaseWord(
+            nextItem(sampleBases), useCache=False), 500, caseRepeat),
+        "wordStore.contains": (lambda: nextItem(sampleWords) in plainStore, 20000, caseRepeat),
+        "wordStore.contains.packed": (lambda: nextItem(sampleWords) in packedStore, 20000, caseRepeat),
+        "manualCheckLetters": (lambda: words.manualCheckLetters(nextItem(sampleBases), nextItem(sampleWords)), 20000, caseRepeat),
+        "mergeSortAlgo": (lambda: game.mergeSortAlgo(shuffledAnswers), 500, caseRepeat),
+        "binarySearchAlgo": (lambda: game.binarySearchAlgo(answers, nextItem(guesses)), 20000, caseRepeat),
+        "checkWord.round": (checkWords, 500, caseRepeat),
+        "startGame": (startGame, 500, caseRepeat),
+    }
+    # longer puzzle modes, each has its own base list and the long answer list
+    for length in range(7, words.maxBaseLength + 1):
+        cases["startGame.len" + str(length)] = (lambda length=length: startGame(length), 500, caseRepeat)
+    return cases
+
+
+def runSuite(seed=1234, only=None):
+    random.seed(seed)
+    # warm the caches first, cold file loading is not what we measure here
+    words.getBaseWord(3)
+    words.getBaseWord(5)
+    words.loadPuzzleStats(3)
+    for length in range(7, words.maxBaseLength + 1):
+        words.getBaseWord(5, words.baseWordPath(length))
+
+    results = {}
+    for name, (func, number, repeat) in makeCases(seed).items():
+        if only and not any(part in name for part in only):
+            continue
+        random.seed(seed)
+        results[name] = timeCase(func, number, repeat)
+        print("{:<42} {:>12.3f} us".format(name, results[name]["median"] * 1e6))
+    return results
+
+
+def compareWithBaseline(results, baseline, threshold):
+    thresholds = baseline.get("thresholds", {})
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        limit = thresholds.get(name, threshold)
+        ratio = result["min"] / old["min"]
+        # a slower machine makes the calibration slower by as much
+        if old.get("calibration"):
+            ratio = ratio * old["calibration"] / result["calibration"]
+        mark = "ok"
+        if ratio > 1 + limit:
+            mark = "REGRESSION"
+            regressions.append(name)
+        print("{:<42} {:>7.2f}x  (limit {:.2f}x)  {}".format(name, ratio, 1 + limit, mark))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TextTwist benchmark suite")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", nargs="*", help="run cases whose name contains one of these")
+    parser.add_argument("--output", default=os.path.join(benchFolder, "results.json"))
+    parser.add_argument("--baseline", default=baselinePath)
+    parser.add_argument("--threshold", type=float, default=defaultThreshold)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = runSuite(args.seed, args.only)
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "seed": args.seed, "results": results}
+
+    f = open(args.output, "w")
+    json.dump(report, f, indent=2, sort_keys=True)
+    f.close()
+
+    if args.update_baseline:
+        thresholds = {}
+        if os.path.exists(args.baseline):
+            f = open(args.baseline)
+            thresholds = json.load(f).get("thresholds", {})
+            f.close()
+        report["thresholds"] = thresholds
+        f = open(args.baseline, "w")
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.close()
+        print("baseline saved to " + args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline yet, run with --update-baseline")
+        return 0
+
+    f = open(args.baseline)
+    baseline = json.load(f)
+    f.close()
+    regressions = compareWithBaseline(results, baseline, args.threshold)
+    if regressions:
+        print("slower than baseline: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
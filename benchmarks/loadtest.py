@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+"""
+Load test: many bot players on TextTwistGame with no display.
+    python benchmarks/loadtest.py --bots 200 --seconds 10
+    python benchmarks/loadtest.py --bots 500 --processes 4 --mix 0.5,0.2,0.3 --output load.json
+
+Every bot plays rounds on its own game with a virtual clock (autoTick=False):
+each submission moves the bot's time forward by --think seconds and the game
+clock is ticked once per virtual second, so a 3 minute round takes only as
+long as the submissions. A submission is a valid answer not found yet, an
+answer the bot already found, or a word that is not an answer, picked with
+the --mix weights. The bots of one process take turns on one thread.
+Reports submissions per second and p50/p99 latency of startGame and checkWord,
+added up over all processes.
+"""
+
+benchFolder = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchFolder))
+
+from metrics import Histogram
+from texttwistgame import TextTwistGame, RoundPrefetcher
+
+
+#Class for one player: a game, the answers it still has to find and its virtual time
+class Bot:
+    def __init__(self, game, rng, mix, thinkTime, difficulty):
+        self.game = game
+        self.rng = rng
+        self.mix = mix  # weights of (valid, duplicate, invalid)
+        self.thinkTime = thinkTime
+        self.difficulty = difficulty
+        self.playing = False
+        self.rounds = 0
+
+    def startRound(self):
+        self.game.resetGame()
+        self.game.startGame(self.difficulty)
+        self.unfound = list(self.game.getWordList())
+        self.rng.shuffle(self.unfound)
+        self.found = []
+        self.virtualTime = 0.0
+        self.playing = True
+        self.rounds += 1
+
+    def nextWord(self):
+        kind = self.rng.choices(("valid", "duplicate", "invalid"), self.mix)[0]
+        if kind == "valid" and self.unfound:
+            word = self.unfound.pop()
+            self.found.append(word)
+            return kind, word
+        if kind == "duplicate" and self.found:
+            return kind, self.rng.choice(self.found)
+        # the base letters in a random order, drawn again while that is an answer
+        letters = list(self.game.getLetters())
+        while True:
+            self.rng.shuffle(letters)
+            word = "".join(letters[:self.rng.randint(3, len(letters))])
+            if not self.game.round.isAnswer(word):
+                return "invalid", word
+
+    # moves the virtual time on, False once the round is over
+    def advanceClock(self):
+        self.virtualTime += self.thinkTime
+        while self.virtualTime >= 1.0:
+            self.virtualTime -= 1.0
+            if not self.game.clock.tick():
+                return False
+        return not self.game.round.allFound()
+
+
+# one process worth of bots, gives counts and latency samples back
+def runBots(botCount, seconds, mix, thinkTime, difficulty, prefetchDepth, seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    prefetcher = RoundPrefetcher(prefetchDepth)
+    bots = []
+    for i in range(botCount):
+        game = TextTwistGame(prefetcher=prefetcher, autoTick=False, highScorePath=None)
+        bots.append(Bot(game, random.Random(rng.random()), mix, thinkTime, difficulty))
+
+    startLatency = Histogram()
+    checkLatency = Histogram()
+    submissions = {"valid": 0, "duplicate": 0, "invalid": 0}
+    accepted = 0
+
+    endTime = time.perf_counter() + seconds
+    while time.perf_counter() < endTime:
+        for bot in bots:
+            if not bot.playing:
+                start = time.perf_counter()
+                bot.startRound()
+                startLatency.add(time.perf_counter() - start)
+
+            kind, word = bot.nextWord()
+            start = time.perf_counter()
+            if bot.game.checkWord(word):
+                accepted += 1
+            checkLatency.add(time.perf_counter() - start)
+            submissions[kind] += 1
+
+            if not bot.advanceClock():
+                bot.playing = False
+    prefetcher.stop()
+
+    rounds = 0
+    for bot in bots:
+        rounds += bot.rounds
+    return {"bots": botCount, "rounds": rounds, "submissions": submissions, "accepted": accepted,
+            "startGame": (startLatency.count, startLatency.samples),
+            "checkWord": (checkLatency.count, checkLatency.samples)}
+
+
+# joins the per process results, percentiles come from all kept samples
+def mergeResults(results, seconds):
+    submissions = {"valid": 0, "duplicate": 0, "invalid": 0}
+    report = {"processes": len(results), "bots": 0, "rounds": 0, "accepted": 0}
+    latencies = {}
+    for result in results:
+        report["bots"] += result["bots"]
+        report["rounds"] += result["rounds"]
+        report["accepted"] += result["accepted"]
+        for kind, count in result["submissions"].items():
+            submissions[kind] += count
+        for name in ("startGame", "checkWord"):
+            count, samples = result[name]
+            histogram = latencies.setdefault(name, Histogram())
+            histogram.count += count
+            histogram.samples.extend(samples)
+
+    total = sum(submissions.values())
+    report["submissions"] = submissions
+    report["submissionsPerSecond"] = round(total / seconds, 1)
+    for name, histogram in latencies.items():
+        summary = histogram.summary()
+        report[name] = {"count": histogram.count,
+                        "p50Us": round(summary["p50"] * 1e6, 2),
+                        "p99Us": round(summary["p99"] * 1e6, 2)}
+    return report
+
+
+def runLoadTest(bots=100, processes=1, seconds=10.0, mix=(0.6, 0.2, 0.2), thinkTime=0.5,
+                difficulty="EASY", prefetchDepth=0, seed=1234):
+    # bots are split as evenly as possible, each process gets its own seed
+    jobs = []
+    for i in range(processes):
+        share = bots // processes + (1 if i < bots % processes else 0)
+        if share:
+            jobs.append((share, seconds, mix, thinkTime, difficulty, prefetchDepth, seed * 1000003 + i))
+
+    wallStart = time.perf_counter()
+    if processes <= 1:
+        results = [runBots(*job) for job in jobs]
+    else:
+        pool = ProcessPoolExecutor(max_workers=len(jobs))
+        try:
+            results = list(pool.map(runBots, *zip(*jobs)))
+        finally:
+            pool.shutdown()
+    # processes start up and load the word lists at different times, so
+    # the rate is over the whole run and not just the timed loops
+    return mergeResults(results, max(time.perf_counter() - wallStart, seconds))
+
+
+def parseMix(text):
+    parts = [float(part) for part in text.split(",")]
+    if len(parts) != 3 or min(parts) < 0 or sum(parts) <= 0:
+        raise argparse.ArgumentTypeError("mix is three weights: valid,duplicate,invalid")
+    return tuple(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mix", type=parseMix, default=(0.6, 0.2, 0.2),
+                        help="weights of valid,duplicate,invalid submissions (default 0.6,0.2,0.2)")
+    parser.add_argument("--think", type=float, default=0.5,
+                        help="virtual seconds between two submissions of one bot")
+    parser.add_argument("--difficulty", choices=["EASY", "HARD"], default="EASY")
+    parser.add_argument("--prefetch-depth", type=int, default=0,
+                        help="rounds kept ready per process (0 = make each round on demand)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    report = runLoadTest(args.bots, args.processes, args.seconds, args.mix, args.think,
+                         args.difficulty, args.prefetch_depth, args.seed)
+    for name, value in report.items():
+        print(name + ": " + str(value))
+    if args.output:
+        f = open(args.output, "w")
+        json.dump(report, f, indent=2)
+        f.close()
+
+
+if __name__ == "__main__":
+    main()
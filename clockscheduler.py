@@ -0,0 +1,151 @@
+import asyncio
+import heapq
+import itertools
+import threading
+
+"""
+One scheduler that runs the countdown of every game clock.
+    -Uses a single asyncio loop instead of one thread per clock.
+    -Keeps a heap of deadlines (monotonic loop time), only the earliest one
+     has a timer on the loop, so idle clocks cost nothing between ticks.
+    -Tick k of a clock is due at start + k seconds, so it does not drift even
+     if a tick is late, and missed ticks are caught up.
+    -Clocks time up through their normal timeIsOver callbacks.
+"""
+
+
+class ClockScheduler:
+    def __init__(self, loop=None):
+        # pass the running loop when used inside an asyncio program,
+        # otherwise start() makes a loop in a background thread
+        self.loop = loop
+        self.thread = None
+
+        self.heap = []  # (deadline, order, token, clock)
+        self.tokens = {}  # clock -> token of its current run
+        self.order = itertools.count()
+        self.timerHandle = None
+        self.timerDeadline = None
+        self.tickCount = 0
+
+    def start(self):
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def runLoop():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=runLoop, name="ClockScheduler")
+        self.thread.daemon = True
+        self.thread.start()
+        ready.wait()
+
+    def shutdown(self):
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            self.thread = None
+            self.loop = None
+
+    # runs func on the scheduler loop, right away if we are already on it
+    def callOnLoop(self, func, *args):
+        try:
+            runningLoop = asyncio.get_running_loop()
+        except RuntimeError:
+            runningLoop = None
+        if runningLoop is self.loop:
+            func(*args)
+        else:
+            self.loop.call_soon_threadsafe(func, *args)
+
+    # (re)starts a clock from its start time
+    def startClock(self, clock):
+        self.callOnLoop(self.addClock, clock)
+
+    # stops a clock without calling its time up functions
+    def stopClock(self, clock):
+        self.callOnLoop(self.removeClock, clock)
+
+    # puts a running clock back to its start time
+    def resetClock(self, clock):
+        self.callOnLoop(clock.resetWhileRunning)
+
+    def activeClockCount(self):
+        return len(self.tokens)
+
+    def addClock(self, clock):
+        clock.begin()
+        # a new token makes old heap entries of this clock stale
+        token = object()
+        self.tokens[clock] = token
+        heapq.heappush(self.heap, (self.loop.time() + 1.0, next(self.order), token, clock))
+        self.rescheduleTimer()
+
+    def removeClock(self, clock):
+        if self.tokens.pop(clock, None) is not None:
+            clock.stopTimer()
+            clock.tick()
+
+    # loop timer: tick every clock that is due, then wait for the next one
+    def fireDueClocks(self):
+        self.timerHandle = None
+        self.timerDeadline = None
+        now = self.loop.time()
+
+        while self.heap and self.heap[0][0] <= now:
+            deadline, order, token, clock = heapq.heappop(self.heap)
+            if self.tokens.get(clock) is not token:
+                continue
+
+            try:
+                stillRunning = clock.tick()
+            except Exception as error:
+                stillRunning = False
+                self.loop.call_exception_handler({"message": "clock tick failed", "exception": error})
+            self.tickCount += 1
+
+            if stillRunning:
+                heapq.heappush(self.heap, (deadline + 1.0, next(self.order), token, clock))
+            elif self.tokens.get(clock) is token:
+                del self.tokens[clock]
+
+        self.rescheduleTimer()
+
+    def rescheduleTimer(self):
+        # drop stale entries on top so the timer is not set for nothing
+        while self.heap and self.tokens.get(self.heap[0][3]) is not self.heap[0][2]:
+            heapq.heappop(self.heap)
+
+        if not self.heap:
+            if self.timerHandle is not None:
+                self.timerHandle.cancel()
+                self.timerHandle = None
+                self.timerDeadline = None
+            return
+
+        earliest = self.heap[0][0]
+        if self.timerHandle is not None:
+            if self.timerDeadline == earliest:
+                return
+            self.timerHandle.cancel()
+        self.timerDeadline = earliest
+        self.timerHandle = self.loop.call_at(earliest, self.fireDueClocks)
+
+
+sharedScheduler = None
+sharedSchedulerLock = threading.Lock()
+
+
+# the scheduler all games use unless they are given their own
+def getSharedScheduler():
+    global sharedScheduler
+    with sharedSchedulerLock:
+        if sharedScheduler is None:
+            sharedScheduler = ClockScheduler()
+            sharedScheduler.start()
+    return sharedScheduler
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import atexit
+import threading
+
+"""
+Timing spans for the slow parts of starting a round.
+    -Turn on with the environment variable TEXTTWIST_METRICS=1, when it is
+     off timingSpan gives back one shared empty object and nothing is kept.
+    -Every span name gets a histogram (count, sum, p50, p95, p99, max).
+    -dumpMetrics() writes them as JSON or Prometheus text, at exit they go to
+     TEXTTWIST_METRICS_FILE (default texttwist_metrics.json, a .prom file
+     name gives Prometheus text).
+"""
+
+metricsEnabled = os.environ.get("TEXTTWIST_METRICS", "") not in ("", "0")
+metricsFile = os.environ.get("TEXTTWIST_METRICS_FILE", "texttwist_metrics.json")
+
+# only the newest samples of each span are kept for the percentiles
+maxSamples = 10000
+
+histograms = {}
+histogramsLock = threading.Lock()
+
+
+#Class that keeps the durations of one span name
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.samples = []
+        self.nextSlot = 0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        # ring buffer, old samples are overwritten
+        if len(self.samples) < maxSamples:
+            self.samples.append(seconds)
+        else:
+            self.samples[self.nextSlot] = seconds
+            self.nextSlot = (self.nextSlot + 1) % maxSamples
+
+    def percentile(self, sortedSamples, fraction):
+        if not sortedSamples:
+            return 0.0
+        index = min(len(sortedSamples) - 1, int(fraction * len(sortedSamples)))
+        return sortedSamples[index]
+
+    def summary(self):
+        sortedSamples = sorted(self.samples)
+        return {"count": self.count, "sum": self.total, "max": self.maximum,
+                "p50": self.percentile(sortedSamples, 0.50),
+                "p95": self.percentile(sortedSamples, 0.95),
+                "p99": self.percentile(sortedSamples, 0.99)}
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class Span:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        recordDuration(self.name, time.perf_counter() - self.start)
+        return False
+
+
+nullSpan = NullSpan()
+
+
+# use as: with timingSpan("answer_generation"): ...
+def timingSpan(name):
+    if not metricsEnabled:
+        return nullSpan
+    return Span(name)
+
+
+def recordDuration(name, seconds):
+    with histogramsLock:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = Histogram()
+            histograms[name] = histogram
+        histogram.add(seconds)
+
+
+def getMetrics():
+    with histogramsLock:
+        result = {}
+        for name, histogram in histograms.items():
+            result[name] = histogram.summary()
+    return result
+
+
+def getMetricsJson():
+    return json.dumps(getMetrics(), indent=2, sort_keys=True)
+
+
+# Prometheus text format, one summary with a phase label
+def getMetricsPrometheus():
+    lines = ["# HELP texttwist_phase_seconds Time spent in each round setup phase.",
+             "# TYPE texttwist_phase_seconds summary"]
+    for name, summary in sorted(getMetrics().items()):
+        for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+            lines.append('texttwist_phase_seconds{phase="%s",quantile="%s"} %.9f' % (name, quantile, summary[key]))
+        lines.append('texttwist_phase_seconds_sum{phase="%s"} %.9f' % (name, summary["sum"]))
+        lines.append('texttwist_phase_seconds_count{phase="%s"} %d' % (name, summary["count"]))
+    return "\n".join(lines) + "\n"
+
+
+def dumpMetrics(path=None):
+    if path is None:
+        path = metricsFile
+    if path.endswith(".prom"):
+        text = getMetricsPrometheus()
+    else:
+        text = getMetricsJson()
+    f = open(path, "w")
+    f.write(text)
+    f.close()
+
+
+def dumpMetricsAtExit():
+    if histograms:
+        try:
+            dumpMetrics()
+        except OSError:
+            print("could not write metrics to " + metricsFile)
+
+
+if metricsEnabled:
+    atexit.register(dumpMetricsAtExit)
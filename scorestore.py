@@ -0,0 +1,178 @@
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+
+"""
+Keeps every finished round in a small SQLite database (scores.db).
+    -WAL mode, so reading the leaderboard never waits for a write.
+    -Indexed top-K queries per difficulty and base word length, and per
+     difficulty and length per day. A 9 letter round scores far more than a
+     6 letter one, so every board is for one length.
+    -addScore only puts the score in a queue, a writer thread saves the
+     queue in batches (one transaction each), so the end of a round never
+     waits for the disk.
+    -The old highscore.txt is imported one time (difficulty "LEGACY").
+    -Databases made before baseLength was stored get the column added, their
+     rounds were all 6 letters.
+"""
+
+schema = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    playedAt REAL NOT NULL,
+    day TEXT NOT NULL,
+    baseLength INTEGER NOT NULL DEFAULT 6
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# made after the migration, the old indexes did not have the length
+indexSchema = """
+DROP INDEX IF EXISTS scoresByDifficulty;
+DROP INDEX IF EXISTS scoresByDay;
+CREATE INDEX IF NOT EXISTS scoresByMode ON scores (difficulty, baseLength, score DESC);
+CREATE INDEX IF NOT EXISTS scoresByDayMode ON scores (day, difficulty, baseLength, score DESC);
+CREATE INDEX IF NOT EXISTS scoresByLength ON scores (baseLength, score DESC);
+"""
+
+
+class ScoreStore:
+    def __init__(self, path="scores.db", legacyPath="highscore.txt", batchSize=100, flushInterval=0.5):
+        self.path = path
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+
+        # connection for reads, shared by the threads that ask for scores
+        self.readLock = threading.Lock()
+        self.reader = sqlite3.connect(path, check_same_thread=False)
+        self.reader.execute("PRAGMA journal_mode=WAL")
+        self.reader.executescript(schema)
+        self.addLengthColumn()
+        self.reader.executescript(indexSchema)
+        self.reader.commit()
+        if legacyPath is not None:
+            self.importLegacyHighScore(legacyPath)
+
+        self.pending = queue.Queue()
+        self.closed = False
+        self.writer = threading.Thread(target=self.writeLoop, name="ScoreStoreWriter")
+        self.writer.daemon = True
+        self.writer.start()
+        atexit.register(self.close)
+
+    # scores.db from before the length was saved
+    def addLengthColumn(self):
+        columns = [row[1] for row in self.reader.execute("PRAGMA table_info(scores)")]
+        if "baseLength" not in columns:
+            self.reader.execute("ALTER TABLE scores ADD COLUMN baseLength INTEGER NOT NULL DEFAULT 6")
+
+    # copies the single number in highscore.txt in, only the first time
+    def importLegacyHighScore(self, legacyPath):
+        with self.readLock:
+            done = self.reader.execute("SELECT value FROM meta WHERE key = 'legacyImported'").fetchone()
+            if done is not None:
+                return
+            try:
+                f = open(legacyPath, "r")
+                content = f.read().strip()
+                f.close()
+                legacyScore = int(content) if content else None
+            except (OSError, ValueError):
+                legacyScore = None
+
+            with self.reader:
+                if legacyScore is not None:
+                    playedAt = os.path.getmtime(legacyPath)
+                    self.reader.execute("INSERT INTO scores (difficulty, score, playedAt, day) VALUES (?, ?, ?, ?)",
+                                        ("LEGACY", legacyScore, playedAt, dayOf(playedAt)))
+                self.reader.execute("INSERT INTO meta (key, value) VALUES ('legacyImported', ?)",
+                                    (str(legacyScore),))
+
+    # does not wait for the disk
+    def addScore(self, score, difficulty="EASY", playedAt=None, baseLength=6):
+        if playedAt is None:
+            playedAt = time.time()
+        self.pending.put((difficulty, int(score), playedAt, dayOf(playedAt), baseLength))
+
+    # writer thread: takes up to batchSize scores and saves them together
+    def writeLoop(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            first = self.pending.get()
+            if first is None:
+                self.pending.task_done()
+                break
+            batch = [first]
+            # wait a little for more scores so they share one transaction
+            deadline = time.monotonic() + self.flushInterval
+            stop = False
+            while len(batch) < self.batchSize:
+                try:
+                    item = self.pending.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            with connection:
+                connection.executemany("INSERT INTO scores (difficulty, score, playedAt, day, baseLength) "
+                                       "VALUES (?, ?, ?, ?, ?)", batch)
+            for i in range(len(batch) + (1 if stop else 0)):
+                self.pending.task_done()
+            if stop:
+                break
+        connection.close()
+
+    # waits until every added score is saved
+    def flush(self):
+        self.pending.join()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.writer.join()
+        with self.readLock:
+            self.reader.close()
+
+    def getTopScores(self, difficulty, limit=10, day=None, baseLength=6):
+        with self.readLock:
+            if day is None:
+                rows = self.reader.execute(
+                    "SELECT score, playedAt FROM scores WHERE difficulty = ? AND baseLength = ? "
+                    "ORDER BY score DESC LIMIT ?", (difficulty, baseLength, limit)).fetchall()
+            else:
+                rows = self.reader.execute(
+                    "SELECT score, playedAt FROM scores WHERE day = ? AND difficulty = ? AND baseLength = ? "
+                    "ORDER BY score DESC LIMIT ?", (day, difficulty, baseLength, limit)).fetchall()
+        return rows
+
+    # best score of one base word length, of one difficulty or of all of them
+    def getHighScore(self, difficulty=None, baseLength=6):
+        with self.readLock:
+            if difficulty is None:
+                row = self.reader.execute("SELECT MAX(score) FROM scores WHERE baseLength = ?",
+                                          (baseLength,)).fetchone()
+            else:
+                row = self.reader.execute("SELECT MAX(score) FROM scores WHERE difficulty = ? AND baseLength = ?",
+                                          (difficulty, baseLength)).fetchone()
+        if row is None or row[0] is None:
+            return 0
+        return row[0]
+
+
+# day of a timestamp in local time, like 2025-12-04
+def dayOf(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
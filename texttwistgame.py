@@ -1,8 +1,12 @@
 import threading
+import queue
+import asyncio
+import tracemalloc
 import os
 from time import sleep
-from tkinter import StringVar
 from words import *
+from clockscheduler import getSharedScheduler
+from metrics import timingSpan
 
 """
 This handles the game logic.
@@ -10,22 +14,37 @@ This handles the game logic.
     -Manages the timer and ends the game when time runs out.
     -Checks and finds valid words from the word list efficiently.
     -Controls the game flow for starting, resetting, and ending rounds.
+    -Does not need tkinter, so games can also run on a server with no display.
+     The UI listens to the clock through callbacks (Clock.tickListeners).
 """
 
 gameTimer = 180
 
+# seconds per round for each difficulty, shortest word is in words.difficultyMinLength
+difficultyTimeLimit = {"EASY": 180, "HARD": 120}
+
+# how many ready rounds to keep waiting for each difficulty
+prefetchDepth = 3
+
 #Class for tracking the remaining time, can start, stop, reset, and notify when time is up
 class Clock:
     def __init__(self, startTime=120):
-        self.displayTime = StringVar()
         self.startTime = startTime
         self.countDownTime = startTime
         self.timeIsOver = []  # list for function to call
+        self.tickListeners = []  # functions called with the time text whenever it changes
 
+        self.running = False
         self.stopTimerFlag = False
         self.resetTimerFlag = False
 
-        self.displayTime.set(str(self))
+        self.updateDisplay()
+
+    # tell everyone listening the new time text
+    def updateDisplay(self):
+        text = str(self)
+        for listener in self.tickListeners:
+            listener(text)
 
     # Returns the current countdown time in seconds
     def getTimeLeft(self):
@@ -35,50 +54,63 @@ class Clock:
     def setTimeLimit(self, new_time):
         self.startTime = new_time
         self.countDownTime = new_time
-        self.displayTime.set(str(self))
+        self.updateDisplay()
 
-    # Starts the countdown timer  in seconds
-    def startTimer(self):
+    # Starts counting down from the start time, tick() has to be called every second
+    def begin(self):
         self.stopTimerFlag = False
+        self.resetTimerFlag = False
         self.countDownTime = self.startTime
-        self.displayTime.set(str(self))
+        self.running = True
+        self.updateDisplay()
 
-        while True:
-            # check if need reset
-            if self.resetTimerFlag:
-                self.countDownTime = self.startTime
-                self.resetTimerFlag = False
+    # One second has passed, returns False once the countdown is over
+    def tick(self):
+        if not self.running:
+            return False
 
-            # check if stop
-            if self.stopTimerFlag:
-                self.stopTimerFlag = False
-                break
+        # check if need reset
+        if self.resetTimerFlag:
+            self.countDownTime = self.startTime
+            self.resetTimerFlag = False
 
-            self.countDownTime -= 1
-            self.displayTime.set(str(self))
+        # check if stop
+        if self.stopTimerFlag:
+            self.stopTimerFlag = False
+            self.running = False
+            return False
 
-            # time reach zero, call function
-            if self.countDownTime == 0:
-                self.timeIsUp()
-                break
+        self.countDownTime -= 1
+        self.updateDisplay()
+
+        # time reach zero, call function
+        if self.countDownTime == 0:
+            self.running = False
+            self.timeIsUp()
+            return False
+        return True
 
+    # Starts the countdown timer  in seconds, runs until the time is up
+    def startTimer(self):
+        self.begin()
+        while self.tick():
             sleep(1)
 
     # Call all functions in the timeIsOver list when the timer reaches zero
     def timeIsUp(self):
-        for functionCall in self.timeIsOver:
+        for functionCall in list(self.timeIsOver):
             functionCall()
 
     # Immediately stops the timer and sets countdown to zero
     def stopTimer(self):
         self.countDownTime = 0
         self.stopTimerFlag = True
-        self.displayTime.set(str(self))
+        self.updateDisplay()
 
     # Resets the timer to the original start time (without starting it)
     def resetTimer(self):
         self.countDownTime = self.startTime
-        self.displayTime.set(str(self))
+        self.updateDisplay()
 
     # Sets a flag to reset the timer during countdown (used in startTimer loop)
     def resetWhileRunning(self):
@@ -91,13 +123,303 @@ class Clock:
                               str(self.countDownTime % 60).zfill(2))
 
 
-class TextTwistGame:
+# base word and sorted answers for one round
+# dictionary: a WordDictionary from words.DictionaryRegistry, its own base
+# word list sets the puzzle size so baseLength is not used with it
+# scoreBand: (low, high) total score the round must have, None for any
+def buildRound(difficulty, sortFunction=sorted, baseLength=6, dictionary=None, scoreBand=None):
+    minLen = difficultyMinLength.get(difficulty, 3)
+    if dictionary is not None:
+        baseFile, answersFile = dictionary.baseFile, dictionary.answersFile
+    else:
+        baseFile = baseWordPath(baseLength)
+        answersFile = answersFileFor(baseFile)
+    with timingSpan("base_word_selection"):
+        if scoreBand is None:
+            baseWordStr = getBaseWord(minLen, baseFile, answersFile, dictionary)
+        else:
+            baseWordStr = getBaseWordInScoreBand(scoreBand[0], scoreBand[1], minLen, baseFile,
+                                                 answersFile, dictionary)
+    with timingSpan("answer_generation"):
+        rawWordsList = list(generateValidWordsFromBaseWord(baseWordStr, minLen, answersFile, dictionary))
+    with timingSpan("answer_sorting"):
+        sortedWords = sortFunction(rawWordsList)
+    return baseWordStr, sortedWords
+
+
+#Class that keeps a few rounds ready for each difficulty, made by a background thread
+class RoundPrefetcher:
+    def __init__(self, depth=prefetchDepth, sortFunction=sorted, dictionary=None):
+        self.depth = depth
+        self.sortFunction = sortFunction
+        self.dictionary = dictionary
+        # queue key -> (difficulty, base word length, score band); 6 letter rounds are keyed
+        # by difficulty alone, longer modes get a queue the first time they are asked for
+        self.queues = {}
+        self.roundSpecs = {}
+        for difficulty in difficultyTimeLimit:
+            self.addQueue(difficulty, 6)
+        self.failed = set()
+
+        # counters to see if the queue runs dry
+        self.hits = 0
+        self.misses = 0
+
+        self.wakeUp = threading.Event()
+        # set once the first rounds are made, so the dictionary is loaded
+        self.ready = threading.Event()
+        self.stopFlag = False
+        # depth 0 only makes rounds on demand (Queue(0) would never be full)
+        self.worker = None
+        if depth > 0:
+            self.worker = threading.Thread(target=self.fillQueues)
+            self.worker.daemon = True
+            self.worker.start()
+
+    def queueKey(self, difficulty, baseLength=6, scoreBand=None):
+        key = difficulty
+        if baseLength != 6:
+            key += "_" + str(baseLength)
+        if scoreBand is not None:
+            key += "_{}-{}".format(scoreBand[0], scoreBand[1])
+        return key
+
+    def addQueue(self, difficulty, baseLength, scoreBand=None):
+        key = self.queueKey(difficulty, baseLength, scoreBand)
+        self.roundSpecs[key] = (difficulty, baseLength, scoreBand)
+        self.queues[key] = queue.Queue(maxsize=self.depth)
+        return self.queues[key]
+
+    # base word and sorted answers for one round
+    def makeRound(self, key):
+        difficulty, baseLength, scoreBand = self.roundSpecs[key]
+        return buildRound(difficulty, self.sortFunction, baseLength, self.dictionary, scoreBand)
+
+    # takes a ready round, or makes one now if the queue is empty
+    def getRound(self, difficulty, baseLength=6, scoreBand=None):
+        key = self.queueKey(difficulty, baseLength, scoreBand)
+        readyQueue = self.queues.get(key)
+        if readyQueue is None:
+            readyQueue = self.addQueue(difficulty, baseLength, scoreBand)
+        try:
+            roundData = readyQueue.get_nowait()
+            self.hits += 1
+        except queue.Empty:
+            self.misses += 1
+            roundData = self.makeRound(key)
+        self.wakeUp.set()
+        return roundData
+
+    # adds the queues of a size before its first round is asked for, so the
+    # worker builds its word lists and tables and not the caller of getRound
+    def warm(self, baseLength, scoreBand=None):
+        for difficulty in difficultyTimeLimit:
+            if self.queueKey(difficulty, baseLength, scoreBand) not in self.queues:
+                self.addQueue(difficulty, baseLength, scoreBand)
+        self.wakeUp.set()
+
+    # True if getRound would not have to make the round itself
+    def hasRound(self, difficulty, baseLength=6, scoreBand=None):
+        key = self.queueKey(difficulty, baseLength, scoreBand)
+        readyQueue = self.queues.get(key)
+        return key in self.failed or (readyQueue is not None and not readyQueue.empty())
+
+    # background loop: top up every queue, then sleep until a round is taken
+    def fillQueues(self):
+        while not self.stopFlag:
+            # copy, getRound may add a queue for a new length meanwhile
+            for key, readyQueue in list(self.queues.items()):
+                while not self.stopFlag and not readyQueue.full() and key not in self.failed:
+                    try:
+                        readyQueue.put(self.makeRound(key))
+                    except Exception:
+                        # e.g. no base word qualifies, getRound will raise it
+                        self.failed.add(key)
+                    # one round of each difficulty is enough to play
+                    if key not in self.failed and not self.ready.is_set():
+                        break
+            if not self.ready.is_set():
+                # first pass done, go back and fill the queues up
+                self.ready.set()
+                continue
+            self.wakeUp.wait()
+            self.wakeUp.clear()
+
+    def stop(self):
+        self.stopFlag = True
+        self.wakeUp.set()
+
+    def getStats(self):
+        queued = {}
+        for key, readyQueue in list(self.queues.items()):
+            queued[key] = readyQueue.qsize()
+        return {"hits": self.hits, "misses": self.misses, "queued": queued}
+
+
+#Class for one letter of the hint trie
+class HintNode:
     def __init__(self):
+        self.children = {}  # letter -> HintNode
+        self.lengthCounts = {}  # word length -> unfound words below this node
+        self.isWord = False  # an unfound word ends here
+
+
+#Class for the prefix trie over the missing answers of a round. Every node
+#counts the unfound words below it by length, so a hint walks the prefix
+#and then takes one step, without looking at the word list
+class HintTrie:
+    def __init__(self, words=()):
+        self.root = HintNode()
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        node = self.root
+        node.lengthCounts[len(word)] = node.lengthCounts.get(len(word), 0) + 1
+        for letter in word:
+            child = node.children.get(letter)
+            if child is None:
+                child = HintNode()
+                node.children[letter] = child
+            node = child
+            node.lengthCounts[len(word)] = node.lengthCounts.get(len(word), 0) + 1
+        node.isWord = True
+
+    # called when a word is found, empty branches are cut off
+    def remove(self, word):
+        path = [self.root]
+        for letter in word:
+            child = path[-1].children.get(letter)
+            if child is None:
+                return False
+            path.append(child)
+        if not path[-1].isWord:
+            return False
+        path[-1].isWord = False
+
+        for depth, node in enumerate(path):
+            remaining = node.lengthCounts[len(word)] - 1
+            if remaining:
+                node.lengthCounts[len(word)] = remaining
+            else:
+                del node.lengthCounts[len(word)]
+            if depth > 0 and not node.lengthCounts:
+                del path[depth - 1].children[word[depth - 1]]
+                break
+        return True
+
+    def findNode(self, prefix):
+        node = self.root
+        for letter in prefix:
+            node = node.children.get(letter)
+            if node is None:
+                return None
+        return node
+
+    def countWithPrefix(self, prefix):
+        node = self.findNode(prefix)
+        if node is None:
+            return 0
+        return sum(node.lengthCounts.values())
+
+    # next letter of the shortest (or longest) unfound word that starts with
+    # prefix and is longer than it, None if there is none
+    def nextLetter(self, prefix="", longest=False):
+        node = self.findNode(prefix)
+        if node is None:
+            return None
+        lengths = [length for length in node.lengthCounts if length > len(prefix)]
+        if not lengths:
+            return None
+        target = max(lengths) if longest else min(lengths)
+        # alphabetical, so the same state always gives the same hint
+        for letter in sorted(node.children):
+            if target in node.children[letter].lengthCounts:
+                return letter
+        return None
+
+
+#Class for the answers of one round, built once in startGame so every
+#question about the round is a dict/set lookup instead of a scan or a search
+class RoundState:
+    def __init__(self, sortedWords=(), baseLength=6):
+        self.words = list(sortedWords)
+        self.baseLength = baseLength
+
+        # word -> its place in the list, also the place in the found bitmap
+        self.positions = {}
+        # length -> words of that length, alphabetical
+        self.wordsByLength = {}
+        self.maxScore = 0
+        for i, word in enumerate(self.words):
+            self.positions[word] = i
+            self.wordsByLength.setdefault(len(word), []).append(word)
+            self.maxScore += len(word)
+
+        self.found = bytearray(len(self.words))  # 1 = found, 0 = missing
+        self.missing = set(self.positions)
+        self.foundByLength = {}
+        self.score = 0
+        # made on the first hint, most rounds never ask for one
+        self.hintTrie = None
+
+    def isAnswer(self, word):
+        return word in self.positions
+
+    def isFound(self, word):
+        position = self.positions.get(word)
+        return position is not None and self.found[position] == 1
+
+    # marks a word found, False if it is not an answer or was found before
+    def markFound(self, word):
+        position = self.positions.get(word)
+        if position is None or self.found[position]:
+            return False
+        self.found[position] = 1
+        self.missing.discard(word)
+        if self.hintTrie is not None:
+            self.hintTrie.remove(word)
+        self.foundByLength[len(word)] = self.foundByLength.get(len(word), 0) + 1
+        self.score += len(word)
+        return True
+
+    def allFound(self):
+        return not self.missing
+
+    def baseWordFound(self):
+        return self.foundByLength.get(self.baseLength, 0) > 0
+
+    # (length, words) from shortest to longest
+    def getWordsByLength(self):
+        return sorted(self.wordsByLength.items())
+
+    def getHintTrie(self):
+        if self.hintTrie is None:
+            self.hintTrie = HintTrie(self.missing)
+        return self.hintTrie
+
+
+# The game itself. Clocks are ticked by one shared ClockScheduler, or by the
+# scheduler passed in. With autoTick=False call game.clock.tick() yourself.
+# For server sessions share one RoundPrefetcher between games and pass
+# highScorePath=None so nothing is read from disk. A game that makes its own
+# prefetcher starts a thread for it, close() stops it.
+# With a scoreStore (scorestore.ScoreStore) every round is saved there
+# instead of highscore.txt. High scores are per base word length, longer
+# rounds use highscore_7.txt and so on.
+class TextTwistGame:
+    def __init__(self, prefetchDepth=prefetchDepth, prefetcher=None, autoTick=True,
+                 scheduler=None, highScorePath="highscore.txt", scoreStore=None, dictionary=None):
         self.clock = Clock(gameTimer)
         self.clock.timeIsOver.append(self.timeIsUp)
-        self.clock_thread = None
+        self.autoTick = autoTick
+        self.scheduler = scheduler
         self.ui_callbacks = {}
 
+        self.highScorePath = highScorePath
+        self.scoreStore = scoreStore
+        self.difficulty = "EASY"
+        self.baseLength = 6
         self.highestScore = {"highestScore": 0}
         self.loadHighScore()
 
@@ -106,6 +428,17 @@ class TextTwistGame:
         self.possibleWordAnswer = []
         self.enteredWordsFromUser = set()
         self.currentScoreDisplayUI = 0
+        self.round = RoundState()
+
+        # rounds are made in the background, 0 turns it off
+        # word lists to play with, None for the default 6 to 9 letter lists
+        self.dictionary = dictionary
+        self.prefetcher = prefetcher
+        # a prefetcher made here is stopped by close(), a passed one is not
+        self.ownsPrefetcher = False
+        if self.prefetcher is None and prefetchDepth > 0:
+            self.prefetcher = RoundPrefetcher(prefetchDepth, dictionary=dictionary)
+            self.ownsPrefetcher = True
 
         self.resetGame()
 
@@ -157,10 +490,23 @@ class TextTwistGame:
                 lowIndex = midIndex + 1
         return False
 
+    # high score file of the current length, highscore.txt for 6 letters
+    def highScoreFile(self):
+        if self.baseLength == 6:
+            return self.highScorePath
+        root, ext = os.path.splitext(self.highScorePath)
+        return root + "_" + str(self.baseLength) + ext
+
     def loadHighScore(self):
+        self.highestScore["highestScore"] = 0
+        if self.scoreStore is not None:
+            self.highestScore["highestScore"] = self.scoreStore.getHighScore(baseLength=self.baseLength)
+            return
+        if self.highScorePath is None:
+            return
         try:
-            if os.path.exists("highscore.txt"):
-                f = open("highscore.txt", "r")
+            if os.path.exists(self.highScoreFile()):
+                f = open(self.highScoreFile(), "r")
                 content = f.read().strip()
                 if content:
                     self.highestScore["highestScore"] = int(content)
@@ -169,17 +515,35 @@ class TextTwistGame:
             self.highestScore["highestScore"] = 0
 
     def updateHighScore(self):
+        # the store keeps every round, saved in the background
+        if self.scoreStore is not None:
+            self.scoreStore.addScore(self.currentScoreDisplayUI, self.difficulty, baseLength=self.baseLength)
+            if self.currentScoreDisplayUI > self.highestScore["highestScore"]:
+                self.highestScore["highestScore"] = self.currentScoreDisplayUI
+            return
+
         # check if score is higher
         if self.currentScoreDisplayUI > self.highestScore["highestScore"]:
             self.highestScore["highestScore"] = self.currentScoreDisplayUI
+            if self.highScorePath is None:
+                return
             # saving the new high score to txt
-            f = open("highscore.txt", "w")
+            f = open(self.highScoreFile(), "w")
             f.write(str(self.highestScore["highestScore"]))
             f.close()
 
     def getHighScore(self):
         return self.highestScore["highestScore"]
 
+    # best (score, time played) of a difficulty at the current length,
+    # empty without a score store
+    def getLeaderboard(self, difficulty=None, limit=5):
+        if self.scoreStore is None:
+            return []
+        if difficulty is None:
+            difficulty = self.difficulty
+        return self.scoreStore.getTopScores(difficulty, limit, baseLength=self.baseLength)
+
     def getScore(self):
         return self.currentScoreDisplayUI
 
@@ -189,45 +553,63 @@ class TextTwistGame:
     def getWordList(self):
         return self.possibleWordAnswer
 
+    def getWordsByLength(self):
+        return self.round.getWordsByLength()
+
+    def getMaxScore(self):
+        return self.round.maxScore
+
     def checkWord(self, word):
-        # check if word already typed by user
-        if word in self.enteredWordsFromUser:
+        # one dict lookup: False if not an answer or already typed by user
+        if not self.round.markFound(word):
             return False
 
-        # using binary search to check if word exist in valid list
-        isWordValid = self.binarySearchAlgo(self.possibleWordAnswer, word)
-
-        if isWordValid:
-            self.enteredWordsFromUser.add(word)
-            self.currentScoreDisplayUI += len(word)
-            # stop timer if all word found
-            if len(self.enteredWordsFromUser) == len(self.possibleWordAnswer):
-                self.clock.stopTimer()
-            return True
-        return False
+        self.enteredWordsFromUser.add(word)
+        self.currentScoreDisplayUI += len(word)
+        # stop timer if all word found
+        if self.round.allFound():
+            self.clock.stopTimer()
+        return True
 
     def levelPassed(self):
-        # loop to find if 6 letter word exist
-        for word in self.enteredWordsFromUser:
-            if len(word) == 6:
-                return True
-        return False
+        # true once a word as long as the base word was found
+        return self.round.baseWordFound()
 
     def getMissingWords(self):
-        # finding word that are missing manually
-        missingList = set()
-        for word in self.possibleWordAnswer:
-            if word not in self.enteredWordsFromUser:
-                missingList.add(word)
-        return missingList
+        # copy so the caller can not change the round
+        return set(self.round.missing)
+
+    # hint: prefix plus the next letter of the shortest (longest=True for the
+    # longest) unfound word starting with prefix, pass it back for one more
+    # letter. None when no unfound word continues the prefix
+    def getHint(self, prefix="", longest=False):
+        prefix = self.matchLetterCase(prefix)
+        letter = self.round.getHintTrie().nextLetter(prefix, longest)
+        if letter is None:
+            return None
+        return prefix + letter
+
+    # how many unfound words start with prefix
+    def countMissingWithPrefix(self, prefix):
+        return self.round.getHintTrie().countWithPrefix(self.matchLetterCase(prefix))
+
+    # the answers have the case of the list they came from (the generated
+    # lists are lower case), so a typed prefix gets the case of the letters
+    def matchLetterCase(self, text):
+        if "".join(self.gameLetters).islower():
+            return text.lower()
+        return text.upper()
 
     def startClock(self):
-        if self.clock_thread and self.clock_thread.is_alive():
-            self.clock.resetWhileRunning()
-        else:
-            self.clock_thread = threading.Thread(target=self.clock.startTimer)
-            self.clock_thread.daemon = True
-            self.clock_thread.start()
+        # ticked from outside
+        if not self.autoTick:
+            self.clock.begin()
+            return
+
+        # (re)starts the countdown, a clock already running starts over
+        if self.scheduler is None:
+            self.scheduler = getSharedScheduler()
+        self.scheduler.startClock(self.clock)
 
     def resetClock(self):
         self.clock.resetTimer()
@@ -239,32 +621,108 @@ class TextTwistGame:
     def addUIUpdate(self, name, func):
         self.ui_callbacks[name] = func
 
-    def startGame(self, difficulty="EASY"):
-        self.enteredWordsFromUser = set()
+    # for asyncio servers: await this to know when the round is over,
+    # gives back the final score
+    async def waitForTimeUp(self):
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
 
-        if difficulty == "HARD":
-            timeLimit = 120
-            minLen = 5
-        else:
-            timeLimit = 180
-            minLen = 3
+        def setResult():
+            if not finished.done():
+                finished.set_result(self.getScore())
+
+        def onTimeUp():
+            # the clock may run on another thread
+            loop.call_soon_threadsafe(setResult)
 
-        self.clock.setTimeLimit(timeLimit)
+        self.clock.timeIsOver.append(onTimeUp)
+        try:
+            return await finished
+        finally:
+            self.clock.timeIsOver.remove(onTimeUp)
 
-        baseWordStr = getBaseWord(minLen)
-        self.gameLetters = list(baseWordStr)
+    # baseLength picks the puzzle size, 6 to maxBaseLength letters
+    # scoreBand (low, high) only picks base words whose answers add up to that score
+    def startGame(self, difficulty="EASY", baseLength=6, scoreBand=None):
+        self.enteredWordsFromUser = set()
+        self.difficulty = difficulty
+        loadedLength = self.baseLength
+        self.baseLength = baseLength
 
-        # getting the words
-        rawWordsList = list(generateValidWordsFromBaseWord(baseWordStr, minLen))
+        self.clock.setTimeLimit(difficultyTimeLimit.get(difficulty, gameTimer))
 
-        # calling sort function
-        self.possibleWordAnswer = self.mergeSortAlgo(rawWordsList)
+        with timingSpan("round_setup"):
+            if self.prefetcher is not None:
+                baseWordStr, sortedWords = self.prefetcher.getRound(difficulty, baseLength, scoreBand)
+            else:
+                baseWordStr, sortedWords = buildRound(difficulty, baseLength=baseLength,
+                                                      dictionary=self.dictionary, scoreBand=scoreBand)
+
+            self.gameLetters = list(baseWordStr)
+            self.possibleWordAnswer = sortedWords
+            with timingSpan("round_state"):
+                self.round = RoundState(sortedWords, len(baseWordStr))
+
+        # a dictionary sets its own size, the high score goes with the real one
+        self.baseLength = len(baseWordStr)
+        if self.baseLength != loadedLength:
+            self.loadHighScore()
 
         self.startClock()
 
+    # True once the dictionary is loaded and a round can start right away,
+    # with a difficulty also once a round of that mode is made
+    def isReady(self, difficulty=None, baseLength=6):
+        if self.prefetcher is None or self.prefetcher.worker is None:
+            return True
+        if not self.prefetcher.ready.is_set():
+            return False
+        return difficulty is None or self.prefetcher.hasRound(difficulty, baseLength)
+
+    # starts making rounds of a size in the background, e.g. when it is picked
+    # in a menu, so the first round of a long size does not wait for its lists
+    def warmLength(self, baseLength):
+        if self.prefetcher is not None and self.prefetcher.worker is not None:
+            self.prefetcher.warm(baseLength)
+
+    # ends the background work of this game: its clock and the prefetcher
+    # thread it started, call it when the game is thrown away
+    def close(self):
+        if self.scheduler is not None:
+            self.scheduler.stopClock(self.clock)
+        if self.ownsPrefetcher:
+            self.prefetcher.stop()
+            self.ownsPrefetcher = False
+
+    def getPrefetchStats(self):
+        if self.prefetcher is None:
+            return {"hits": 0, "misses": 0, "queued": {}}
+        return self.prefetcher.getStats()
+
     def resetGame(self):
         self.possibleWordAnswer = []
+        self.round = RoundState()
         self.enteredWordsFromUser = set()
         self.currentScoreDisplayUI = 0
         self.gameLetters = []
-        self.resetClock()
\ No newline at end of file
+        self.resetClock()
+
+
+# bytes used per headless game, measured with tracemalloc
+def measureSessionMemory(sessionCount=1000, difficulty="EASY"):
+    prefetcher = RoundPrefetcher(0)
+    # load the word indexes first so they are not counted
+    prefetcher.makeRound(difficulty)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = []
+    for i in range(sessionCount):
+        game = TextTwistGame(prefetcher=prefetcher, autoTick=False, highScorePath=None)
+        game.startGame(difficulty)
+        games.append(game)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    prefetcher.stop()
+    return (after - before) / sessionCount
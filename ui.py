@@ -1,7 +1,11 @@
 import tkinter as tk
+import tkinter.font as tkfont
 import random
+import time
+import threading
 from string import ascii_lowercase, ascii_uppercase
 import os
+from metrics import timingSpan, recordDuration, metricsEnabled
 
 
 """
@@ -18,9 +22,239 @@ All visual elements and user interactions are controlled in this file.
 WINDOW_HEIGHT = 600
 WINDOW_WIDTH = 800
 
+# how often (ms) the Tk thread runs the events sent by the game
+EVENT_PUMP_INTERVAL = 30
+
+# puzzle sizes offered on the start page (letters in the base word)
+BASE_LENGTHS = (6, 7, 8, 9)
+# answer slots area, a round with more rows than fit here scrolls
+SOLUTION_HEIGHT = 230
+SOLUTION_WIDTH = 560
+
+
+#Class that carries updates from the game (clock thread) to the Tk thread.
+#Tk must only be touched from its own thread, so the game posts here and a
+#periodic after() pump runs the updates. Posts with the same key replace
+#each other (e.g. many clock ticks between two pumps only draw the last one)
+class UIEventQueue:
+    def __init__(self, root, interval=EVENT_PUMP_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.pending = {}  # key -> [func, args, time of first post], in post order
+
+        # stats
+        self.posted = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.maxDepth = 0
+        self.latencyTotal = 0.0
+        self.latencyMax = 0.0
+
+        self.root.after(self.interval, self.pump)
+
+    # safe from any thread
+    def post(self, key, func, *args):
+        with self.lock:
+            self.posted += 1
+            event = self.pending.get(key)
+            if event is not None:
+                # keep the first post time so latency counts the whole wait
+                event[0] = func
+                event[1] = args
+                self.coalesced += 1
+            else:
+                self.pending[key] = [func, args, time.perf_counter()]
+                self.maxDepth = max(self.maxDepth, len(self.pending))
+
+    # runs on the Tk thread
+    def pump(self):
+        # next pump first, so one failing update does not stop the queue
+        self.root.after(self.interval, self.pump)
+
+        with self.lock:
+            events = self.pending
+            self.pending = {}
+
+        now = time.perf_counter()
+        for func, args, postedAt in events.values():
+            latency = now - postedAt
+            self.latencyTotal += latency
+            self.latencyMax = max(self.latencyMax, latency)
+            self.delivered += 1
+            func(*args)
+
+    def getStats(self):
+        with self.lock:
+            depth = len(self.pending)
+        averageMs = 0.0
+        if self.delivered:
+            averageMs = 1000 * self.latencyTotal / self.delivered
+        return {"depth": depth, "maxDepth": self.maxDepth, "posted": self.posted,
+                "coalesced": self.coalesced, "delivered": self.delivered,
+                "latencyAvgMs": averageMs, "latencyMaxMs": 1000 * self.latencyMax}
+
+
+#Class for the letter tiles and the input slots, kept in plain python so a
+#key press is a dict lookup and only the two labels that change are touched.
+#Tiles are numbered in the order their labels were made, shuffling only
+#moves the labels around on screen
+class TileInputModel:
+    def __init__(self, slotCount=6):
+        self.slotCount = slotCount
+        self.tileLetters = []
+        self.freeTiles = {}  # KEY LETTER -> tile numbers still free
+        self.typed = []  # (tile number, letter) in typed order, the cursor is len(typed)
+
+    def setLetters(self, letters):
+        self.tileLetters = list(letters)
+        self.freeTiles = {}
+        for tileNumber, letter in enumerate(self.tileLetters):
+            if letter.strip():
+                self.freeTiles.setdefault(letter.upper(), []).append(tileNumber)
+        self.typed = []
+
+    # gives (tile number, input slot) that changed, or None
+    def typeLetter(self, char):
+        free = self.freeTiles.get(char.upper())
+        if not free or len(self.typed) >= self.slotCount:
+            return None
+        tileNumber = free.pop()
+        self.typed.append((tileNumber, self.tileLetters[tileNumber]))
+        return tileNumber, len(self.typed) - 1
+
+    # gives (tile number, input slot, letter) for the letter that went back, or None
+    def backspace(self):
+        if not self.typed:
+            return None
+        tileNumber, letter = self.typed.pop()
+        self.freeTiles[letter.upper()].append(tileNumber)
+        return tileNumber, len(self.typed), letter
+
+    # the word is made from the tile letters, so it has the same case as the word list
+    def getWord(self):
+        return "".join(letter for tileNumber, letter in self.typed)
+
+
+#Class for the answer slots in the top box. The labels are kept and reused
+#between rounds, and each word length has a pointer to its next blank slot,
+#so revealing a word does not scan the labels
+class SolutionGrid:
+    def __init__(self, parent):
+        # the labels sit in a frame on a canvas, so 9 letter rounds with 100+
+        # answers scroll instead of pushing the window past its size
+        self.canvas = tk.Canvas(parent, bg="#E4DFD7", width=SOLUTION_WIDTH, height=SOLUTION_HEIGHT,
+                                highlightthickness=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = tk.Scrollbar(parent, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.frame = tk.Frame(self.canvas, bg="#E4DFD7")
+        self.window = self.canvas.create_window(0, 0, window=self.frame, anchor="n")
+        self.frame.bind("<Configure>", self.placeFrame)
+        self.canvas.bind("<Configure>", self.placeFrame)
+        self.font = tkfont.Font(family="Calibri", size=12)
+
+        self.labels = []  # every label made so far
+        self.usedCount = 0  # labels used this round
+        self.slotsByLength = {}  # length -> labels for words of that length
+        self.nextSlot = {}  # length -> index of the first blank label
+
+    # puts one blank slot per answer, answers given as (length, words)
+    def layout(self, wordsByLength):
+        count = 0
+        for length, wordsOfLength in wordsByLength:
+            count += len(wordsOfLength)
+
+        # logic for grid size,, manual math
+        # long puzzles can have 100+ answers, so there are only as many columns
+        # as fit the width, rows are packed tighter and the rest scrolls
+        w = (count + 6) // 7
+        if w < 4: w = 4
+        w = min(w, self.columnsThatFit(wordsByLength))
+        h = max((count + w - 1) // w, 1)
+        pady = 5 if h <= 7 else 1
+
+        self.slotsByLength = {}
+        self.nextSlot = {}
+        idx = 0
+        for length, wordsOfLength in wordsByLength:
+            slots = []
+            for word in wordsOfLength:
+                if idx < len(self.labels):
+                    lbl = self.labels[idx]
+                else:
+                    lbl = tk.Label(self.frame, font=("Calibri", 12), bg="#E4DFD7")
+                    self.labels.append(lbl)
+                lbl.config(text="_" * length, fg="#232323")
+                lbl.grid(row=idx % h, column=idx // h, padx=10, pady=pady)
+                slots.append(lbl)
+                idx += 1
+            self.slotsByLength[length] = slots
+            self.nextSlot[length] = 0
+
+        # labels left over from a bigger round are hidden, not destroyed
+        for lbl in self.labels[idx:self.usedCount]:
+            lbl.grid_remove()
+        self.usedCount = idx
+        self.canvas.yview_moveto(0)
+
+    # columns of the longest answer that fit side by side (padx 10 on each side)
+    def columnsThatFit(self, wordsByLength):
+        longest = 1
+        for length, wordsOfLength in wordsByLength:
+            if wordsOfLength: longest = max(longest, length)
+        width = self.canvas.winfo_width()
+        if width <= 1: width = SOLUTION_WIDTH
+        return max(width // (self.font.measure("W" * longest) + 20), 1)
+
+    # keeps the slots in the middle like the old grid in the pane, and
+    # scrollable (with a scrollbar) once they are higher than the canvas
+    def placeFrame(self, event=None):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        frameHeight = self.frame.winfo_reqheight()
+        self.canvas.coords(self.window, width // 2, max((height - frameHeight) // 2, 0))
+        self.canvas.configure(scrollregion=(0, 0, width, max(frameHeight, height)))
+        if frameHeight > height:
+            self.scrollbar.grid(row=0, column=1, sticky="ns")
+        else:
+            self.scrollbar.grid_remove()
+
+    def clear(self):
+        for lbl in self.labels[:self.usedCount]:
+            lbl.grid_remove()
+        self.usedCount = 0
+        self.slotsByLength = {}
+        self.nextSlot = {}
+
+    def getActiveLabels(self):
+        return self.labels[:self.usedCount]
+
+    # fills the first blank slot with the same length as the word
+    def reveal(self, word, color="#232323"):
+        slots = self.slotsByLength.get(len(word))
+        position = self.nextSlot.get(len(word), 0)
+        if slots is None or position >= len(slots):
+            return False
+        slots[position].config(text=word, fg=color)
+        self.nextSlot[len(word)] = position + 1
+        return True
+
+    # many words at once, Tk redraws once when it is idle again
+    def revealMany(self, wordList, color="#232323"):
+        for word in wordList:
+            self.reveal(word, color)
+
 
 class TextTwistUI:
-    def __init__(self):
+    def __init__(self, startTime=None):
+        # for the startup report: time to first frame and time until ready
+        self.startTime = startTime
+        if self.startTime is None:
+            self.startTime = time.perf_counter()
+        self.firstFrameTime = None
+        self.firstFrameCallbacks = []
+
         self.__root = tk.Tk()
         self.__root.title("TextTwist Game")
         self.__root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
@@ -30,19 +264,26 @@ class TextTwistUI:
         self.__root.columnconfigure(0, weight=1)
         self.__root.rowconfigure(0, weight=1)
 
+        # every update from the game goes through this queue
+        self.events = UIEventQueue(self.__root)
+
         #Score
         self.high_score = 0
         self.btn_easy = None
         self.btn_hard = None
         self.current_difficulty = "EASY"
+        self.current_length = 6
+        self.hint_text = ""
+        self.game = None
 
-        # making the frames
+        # only the start page is made now, the game page is made on the
+        # first start and the button images after the first frame is shown
+        self.game_page_frame = None
         self.createStartPage()
-        self.createGamePage()
 
         # grid the start page
         self.start_page_frame.grid(row=0, column=0, sticky="nsew")
-        self.game_page_frame.grid_remove()
+        self.start_page_frame.bind("<Map>", self.onStartPageShown)
 
         self.initializeKeyBindings()
         self.setDifficulty("EASY")
@@ -86,42 +327,34 @@ class TextTwistUI:
         f2 = tk.Frame(self.start_page_frame, bg="white")
         f2.grid(row=2, column=0, pady=10)
 
-        curr = os.path.dirname(os.path.abspath(__file__))
-
         # easy button
-        easyF = tk.Frame(f2, bg="white")
-        easyF.grid(row=0, column=0, padx=40)
-
-        try:
-            p = os.path.join(curr, "images", "1.png")
-            self.easy_img_tk = tk.PhotoImage(file=p)
-            l = tk.Label(easyF, image=self.easy_img_tk, bg="white", bd=0)
-            l.grid(row=0, column=0, sticky="ew")
-        except:
-            tk.Label(easyF, text="[IMG]", bg="white", fg="red").grid(row=0, column=0)
+        self.easy_frame = tk.Frame(f2, bg="white")
+        self.easy_frame.grid(row=0, column=0, padx=40)
 
-        self.btn_easy = tk.Button(easyF, text="EASY LEVEL", font=("Calibri", 12, "bold"), cursor="hand2",
+        self.btn_easy = tk.Button(self.easy_frame, text="EASY LEVEL", font=("Calibri", 12, "bold"), cursor="hand2",
                                   bg="#E4DFD7", fg="#232323", relief="raised",
                                   command=lambda: self.setDifficulty("EASY"))
         self.btn_easy.grid(row=1, column=0, pady=0, ipady=3, ipadx=20)
 
         # hard button
-        hardF = tk.Frame(f2, bg="white")
-        hardF.grid(row=0, column=1, padx=40)
-
-        try:
-            p2 = os.path.join(curr, "images", "2.png")
-            self.hard_img_tk = tk.PhotoImage(file=p2)
-            l2 = tk.Label(hardF, image=self.hard_img_tk, bg="white", bd=0)
-            l2.grid(row=0, column=0, sticky="ew")
-        except:
-            tk.Label(hardF, text="[IMG]", bg="white", fg="red").grid(row=0, column=0)
+        self.hard_frame = tk.Frame(f2, bg="white")
+        self.hard_frame.grid(row=0, column=1, padx=40)
 
-        self.btn_hard = tk.Button(hardF, text="HARD LEVEL", font=("Calibri", 12, "bold"), cursor="hand2",
+        self.btn_hard = tk.Button(self.hard_frame, text="HARD LEVEL", font=("Calibri", 12, "bold"), cursor="hand2",
                                   bg="#E4DFD7", fg="#232323", relief="raised",
                                   command=lambda: self.setDifficulty("HARD"))
         self.btn_hard.grid(row=1, column=0, pady=0, ipady=3, ipadx=20)
 
+        # letter count choice
+        f3 = tk.Frame(self.start_page_frame, bg="white")
+        f3.grid(row=3, column=0, pady=(20, 0))
+
+        tk.Label(f3, text="LETTERS:", font=("Calibri", 12, "bold"), bg="white",
+                 fg="#232323").grid(row=0, column=0, padx=5)
+        self.length_var = tk.IntVar(value=self.current_length)
+        self.length_menu = tk.OptionMenu(f3, self.length_var, *BASE_LENGTHS, command=self.setBaseLength)
+        self.length_menu.config(font=("Calibri", 12, "bold"), bg="#E4DFD7", fg="#232323", cursor="hand2")
+        self.length_menu.grid(row=0, column=1, padx=5)
 
         # start game button
         self.main_start_btn = tk.Button(self.start_page_frame, text="START GAME", font=("Calibri", 15, "bold"),
@@ -130,6 +363,59 @@ class TextTwistUI:
                                         command=self.startGameSession)
         self.main_start_btn.grid(row=4, column=0, ipadx=20, ipady=3, pady=(70, 0))
 
+    # the button pictures are loaded after the first frame so it shows sooner
+    def loadButtonImages(self):
+        curr = os.path.dirname(os.path.abspath(__file__))
+
+        try:
+            p = os.path.join(curr, "images", "1.png")
+            self.easy_img_tk = tk.PhotoImage(file=p)
+            l = tk.Label(self.easy_frame, image=self.easy_img_tk, bg="white", bd=0)
+            l.grid(row=0, column=0, sticky="ew")
+        except:
+            tk.Label(self.easy_frame, text="[IMG]", bg="white", fg="red").grid(row=0, column=0)
+
+        try:
+            p2 = os.path.join(curr, "images", "2.png")
+            self.hard_img_tk = tk.PhotoImage(file=p2)
+            l2 = tk.Label(self.hard_frame, image=self.hard_img_tk, bg="white", bd=0)
+            l2.grid(row=0, column=0, sticky="ew")
+        except:
+            tk.Label(self.hard_frame, text="[IMG]", bg="white", fg="red").grid(row=0, column=0)
+
+    def onStartPageShown(self, event):
+        self.start_page_frame.unbind("<Map>")
+        # idle runs after the window is drawn
+        self.__root.after_idle(self.onFirstFrame)
+
+    def onFirstFrame(self):
+        self.firstFrameTime = time.perf_counter() - self.startTime
+        self.loadButtonImages()
+        for func in self.firstFrameCallbacks:
+            func()
+        self.waitUntilReady()
+
+    # run func once the first frame is on screen (e.g. making the game object)
+    def afterFirstFrame(self, func):
+        if self.firstFrameTime is not None:
+            func()
+        else:
+            self.firstFrameCallbacks.append(func)
+
+    def isGameReady(self, difficulty=None, baseLength=6):
+        return self.game is not None and self.game.isReady(difficulty, baseLength)
+
+    # checks every 50 ms if the dictionary is loaded, then reports startup times
+    def waitUntilReady(self):
+        if not self.isGameReady():
+            self.__root.after(50, self.waitUntilReady)
+            return
+        readyTime = time.perf_counter() - self.startTime
+        if metricsEnabled:
+            recordDuration("startup_first_frame", self.firstFrameTime)
+            recordDuration("startup_ready", readyTime)
+            print("startup: first frame {:.3f}s, ready {:.3f}s".format(self.firstFrameTime, readyTime))
+
     def setDifficulty(self, mode):
         self.current_difficulty = mode
         if self.btn_easy is None: return
@@ -142,6 +428,12 @@ class TextTwistUI:
             self.btn_easy.config(bg="#E4DFD7", fg="#232323", relief="raised")
             self.btn_hard.config(bg="#181716", fg="white", relief="sunken")
 
+    # longer sizes build their word lists the first time, start that now
+    def setBaseLength(self, length):
+        self.current_length = int(length)
+        if self.game is not None:
+            self.game.warmLength(self.current_length)
+
     def createGamePage(self):
         self.game_page_frame = tk.Frame(self.__root, bg="white")
         self.game_page_frame.columnconfigure(0, weight=1)
@@ -169,7 +461,7 @@ class TextTwistUI:
                        relief="raised", borderwidth=3, cursor="heart")
         b2.grid(row=0, column=1, sticky="n", ipadx=10)
 
-        b3 = tk.Button(self.header_pane, text="❌ Exit", command=self.__root.destroy,
+        b3 = tk.Button(self.header_pane, text="❌ Exit", command=self.quitApp,
                        font=("Calibri", 12, "bold"), bg="#181716", fg="white",
                        relief="raised", borderwidth=3, cursor="heart")
         b3.grid(row=0, column=2, sticky="e", ipadx=10)
@@ -179,6 +471,12 @@ class TextTwistUI:
                                  height=300, bg="#E4DFD7",
                                  highlightbackground="#181716", highlightthickness=0)
         self.top_pane.grid(row=1, column=0, sticky="nsew", padx=12, pady=(5, 5), ipadx=50)
+        self.top_pane.columnconfigure(0, weight=1)
+        self.top_pane.rowconfigure(0, weight=1)
+
+        # answer slots, reused every round
+        self.solution_grid = SolutionGrid(self.top_pane)
+        self.solution_labels = []
 
         # bottom area for inputs
         self.bottom_pane = tk.Frame(main, relief="ridge", borderwidth=4, width=WINDOW_WIDTH,
@@ -206,12 +504,9 @@ class TextTwistUI:
         c_in = tk.Frame(f_in, bg="#E4DFD7")
         c_in.pack(expand=True, pady=10)
 
+        self.input_frame = c_in
+        self.entry_pool = []
         self.entry_labels = []
-        for i in range(6):
-            l = tk.Label(c_in, font=("Calibri", 20, "bold"), bg="white", fg="#181716",
-                         relief="sunken", borderwidth=2, width=3, height=1)
-            l.grid(row=0, column=i, padx=5)
-            self.entry_labels.append(l)
 
         # letters
         f_let = tk.Frame(tf, bg="#E4DFD7")
@@ -220,12 +515,10 @@ class TextTwistUI:
         c_let = tk.Frame(f_let, bg="#E4DFD7")
         c_let.pack(expand=True, pady=10)
 
+        self.tile_frame = c_let
+        self.letter_pool = []
         self.letter_labels = []
-        for i in range(6):
-            l = tk.Label(c_let, font=("Calibri", 20, "bold"), bg="#181716", fg="white",
-                         relief="raised", borderwidth=4, width=3, height=1)
-            l.grid(row=0, column=i, padx=5)
-            self.letter_labels.append(l)
+        self.resizeTiles(6)
 
         # score label
         f_stat = tk.Frame(tf, bg="#E4DFD7")
@@ -261,7 +554,12 @@ class TextTwistUI:
         for w in self.clock_frame.winfo_children():
             w.destroy()
 
-        self.clock_label = tk.Label(self.clock_frame, textvariable=clock.displayTime,
+        # the clock has no tkinter in it, so the UI keeps its own StringVar
+        self.clock_text = tk.StringVar(value=str(clock))
+        # ticks come from the clock thread, the queue sets the text on the Tk thread
+        clock.tickListeners.append(lambda text: self.events.post("clock", self.clock_text.set, text))
+
+        self.clock_label = tk.Label(self.clock_frame, textvariable=self.clock_text,
                                     font=('Courier', 24, 'bold'), bg="white", fg="#232323", anchor="e")
         self.clock_label.grid(row=0, column=0, padx=20, sticky="e")
 
@@ -275,7 +573,13 @@ class TextTwistUI:
                                    bg="#181716", fg="white", relief="raised", borderwidth=3,
                                    activebackground="#4a4a4a", activeforeground="white", cursor="heart",
                                    command=self.restartRound)
-        self.reset_btn.grid(row=0, column=2, padx=(5, 20), pady=10, sticky="e", ipadx=15)
+        self.reset_btn.grid(row=0, column=2, padx=5, pady=10, sticky="e", ipadx=15)
+
+        self.hint_btn = tk.Button(self.clock_frame, text="💡 Hint", font=("Calibri", 13, "bold"),
+                                  bg="#181716", fg="white", relief="raised", borderwidth=3,
+                                  activebackground="#4a4a4a", activeforeground="white", cursor="heart",
+                                  command=self.showHint)
+        self.hint_btn.grid(row=0, column=3, padx=(5, 20), pady=10, sticky="e", ipadx=10)
 
     def initializeKeyBindings(self):
         self.bindings = {}
@@ -285,56 +589,54 @@ class TextTwistUI:
         self.bindings["<BackSpace>"] = self.handleBackspace
         self.bindings["<Return>"] = self.submitWord
 
+        # bound one time only, toggleKeyBindings just turns them on and off
+        self.keys_active = False
+        for k, v in self.bindings.items():
+            self.__root.bind_all(k, lambda event, handler=v: self.dispatchKey(handler, event))
+
+    def dispatchKey(self, handler, event):
+        if self.keys_active:
+            handler(event)
+
     def toggleKeyBindings(self, action=0):
-        if action == 1:
-            for k, v in self.bindings.items():
-                self.__root.bind_all(k, v)
-        else:
-            for k in self.bindings:
-                self.__root.unbind_all(k)
+        with timingSpan("key_binding"):
+            self.keys_active = action == 1
 
     def add_game_object_to_ui(self, game):
         self.game = game
-        self.bindClockToUi(game.clock)
+        if self.game_page_frame is not None:
+            self.bindClockToUi(game.clock)
         self.game.addUIUpdate("process_clock_reached_zero", self.handleGameEnd)
 
+    # makes the game page the first time it is needed
+    def ensureGamePage(self):
+        if self.game_page_frame is not None:
+            return
+        self.createGamePage()
+        self.game_page_frame.grid_remove()
+        self.bindClockToUi(self.game.clock)
+
     def handleTypedLetter(self, event):
         char = event.char.upper()
         if char in ascii_uppercase:
-            for lbl in self.letter_labels:
-                if char == lbl['text']:
-                    self.fillInputSlot(char)
-                    lbl['text'] = ' '
-                    lbl['relief'] = "sunken"
-                    break
-
-    def fillInputSlot(self, char):
-        for entry in self.entry_labels:
-            if entry['text'] == ' ' or entry['text'] == '_':
-                entry['text'] = char
-                break
+            changed = self.tile_model.typeLetter(char)
+            if changed is not None:
+                tileNumber, slot = changed
+                self.tile_labels[tileNumber].config(text=' ', relief="sunken")
+                self.entry_labels[slot].config(text=char)
 
     def handleBackspace(self, event):
-        for entry in reversed(self.entry_labels):
-            if entry['text'] != ' ' and entry['text'] != '_':
-                self.returnLetterToTile(entry)
-                break
-
-    def returnLetterToTile(self, entry):
-        for lbl in self.letter_labels:
-            if lbl['text'] == ' ':
-                lbl['text'] = entry['text']
-                lbl['bg'] = "#181716"
-                lbl['relief'] = "raised"
-                entry['text'] = ' '
-                break
+        changed = self.tile_model.backspace()
+        if changed is not None:
+            tileNumber, slot, letter = changed
+            self.returnLetterToTile(tileNumber, slot, letter)
+
+    def returnLetterToTile(self, tileNumber, slot, letter):
+        self.tile_labels[tileNumber].config(text=letter, bg="#181716", relief="raised")
+        self.entry_labels[slot].config(text=' ')
 
     def submitWord(self, event):
-        arr = []
-        for l in self.entry_labels:
-            if l['text'] != " " and l['text'] != "_":
-                arr.append(l['text'])
-        word = "".join(arr)
+        word = self.tile_model.getWord()
 
         if self.game.checkWord(word):
             self.revealSolutionWord(word)
@@ -342,13 +644,24 @@ class TextTwistUI:
             self.updateGameStatusLabels()
 
     def revealSolutionWord(self, word, color="#232323"):
-        for sol in self.solution_labels:
-            if "_" in sol['text'] and len(sol['text']) == len(word):
-                sol['text'] = word
-                sol['fg'] = color
-                break
+        self.solution_grid.reveal(word, color)
+
+    # every press shows one more letter of the shortest unfound word
+    def showHint(self):
+        if self.game is None or not self.keys_active:
+            return
+        hint = self.game.getHint(self.hint_text)
+        if hint is None:
+            # that word was found meanwhile, start on the next one
+            hint = self.game.getHint()
+        if hint is None:
+            return
+        self.hint_text = hint
+        count = self.game.countMissingWithPrefix(hint)
+        self.level_status_label['text'] = f"Hint: {hint}... ({count} left)"
 
     def updateGameStatusLabels(self):
+        self.hint_text = ""
         score = self.game.getScore()
         self.score_label['text'] = f"Score: {score}"
         if self.game.levelPassed():
@@ -368,14 +681,40 @@ class TextTwistUI:
         self.resetInputSlotsText()
         self.updateTileDisplay(self.game.getLetters())
 
-    def updateTileDisplay(self, letters=[" "] * 6):
+    def updateTileDisplay(self, letters=None):
+        if letters is None:
+            letters = [" "] * len(self.tile_labels)
         self.letters = letters
         random.shuffle(self.letters)
+        self.tile_model.setLetters(self.letters)
         i = 0
         for x in self.letters:
-            self.letter_labels[i].config(text=x)
+            self.tile_labels[i].config(text=x, bg="#181716", relief="raised")
             i += 1
 
+    # shows n input slots and n tiles, labels are made once and kept for
+    # shorter rounds, so switching between sizes does not rebuild them
+    def resizeTiles(self, n):
+        while len(self.entry_pool) < n:
+            self.entry_pool.append(tk.Label(self.input_frame, font=("Calibri", 20, "bold"), bg="white",
+                                            fg="#181716", relief="sunken", borderwidth=2, width=3, height=1))
+            self.letter_pool.append(tk.Label(self.tile_frame, font=("Calibri", 20, "bold"), bg="#181716",
+                                             fg="white", relief="raised", borderwidth=4, width=3, height=1))
+
+        for i in range(len(self.entry_pool)):
+            if i < n:
+                self.entry_pool[i].grid(row=0, column=i, padx=5)
+                self.letter_pool[i].grid(row=0, column=i, padx=5)
+            else:
+                self.entry_pool[i].grid_remove()
+                self.letter_pool[i].grid_remove()
+
+        self.entry_labels = self.entry_pool[:n]
+        self.letter_labels = self.letter_pool[:n]
+        # letter_labels is reordered by shuffle, tile_labels keeps the tile numbers
+        self.tile_labels = list(self.letter_labels)
+        self.tile_model = TileInputModel(n)
+
     def shuffleTiles(self, *args):
         random.shuffle(self.letter_labels)
         i = 0
@@ -384,42 +723,18 @@ class TextTwistUI:
             i += 1
 
     def generateSolutionGrid(self):
-        for w in self.top_pane.winfo_children():
-            w.destroy()
-
-        self.top_pane.columnconfigure(0, weight=1)
-        self.top_pane.rowconfigure(0, weight=1)
-
-        f = tk.Frame(self.top_pane, bg="#E4DFD7")
-        f.grid(row=0, column=0)
-
-        self.solution_labels = []
-        wl = self.game.getWordList()
-
-        # logic for grid size,, manual math
-        count = len(wl)
-        w = (count + 6) // 7
-        if w < 4: w = 4
-        h = (count + w - 1) // w
-
-        idx = 0
-        for word in sorted(wl, key=len):
-            lbl = tk.Label(f, font=("Calibri", 12), text="_" * len(word), bg="#E4DFD7",
-                           fg="#232323")
-            r = idx % h
-            c = idx // h
-            lbl.grid(row=r, column=c, padx=10, pady=5)
-            self.solution_labels.append(lbl)
-            idx += 1
+        with timingSpan("solution_grid"):
+            # the round already has the words grouped by length, no sorting here
+            self.solution_grid.layout(self.game.getWordsByLength())
+            self.solution_labels = self.solution_grid.getActiveLabels()
 
     def clearSolutionGrid(self):
-        for w in self.top_pane.winfo_children():
-            w.destroy()
+        self.solution_grid.clear()
+        self.solution_labels = []
 
     def showMissingWords(self):
         missing = self.game.getMissingWords()
-        for word in sorted(missing, key=len):
-            self.revealSolutionWord(word, color="#6D2932")
+        self.solution_grid.revealMany(sorted(missing, key=len), color="#6D2932")
 
     def _createCenteredPopup(self, title, width, height):
         self.__root.update_idletasks()
@@ -435,13 +750,15 @@ class TextTwistUI:
         return top
 
     def openRulesPopup(self):
-        p = self._createCenteredPopup("Rules of the game", 300, 250)
+        p = self._createCenteredPopup("Rules of the game", 300, 290)
 
         t = (
             "✨ Welcome to TextTwist! ✨\n\n"
-            "Easy: 3mins to find 3–6 letters words\n"
-            "Hard: 2mins to find 5–6 letters words\n\n"
+            "Easy: 3mins to find words of 3+ letters\n"
+            "Hard: 2mins to find words of 5+ letters\n"
+            "Letters: play with 6 to 9 letter words\n\n"
             "🔀 Shuffle: Rearrange letters\n"
+            "💡 Hint: One more letter of a word\n"
             "🔄 Reset: Start a new round\n"
             "🏆 Score: See highest score\n"
             "✖ Exit: Quit game\n\n"
@@ -452,10 +769,22 @@ class TextTwistUI:
         tk.Button(p, text="OK", command=p.destroy, bg="#181716", fg="white").pack()
 
     def openHighScorePopup(self):
-        p = self._createCenteredPopup("High Score", 300, 200)
+        board = self.game.getLeaderboard(self.current_difficulty)
+        p = self._createCenteredPopup("High Score", 300, 200 + 25 * len(board))
         tk.Label(p, text="Highest Score", font=("Calibri", 18), bg="#E5DED2").pack(pady=20)
         tk.Label(p, text=f"{self.game.getHighScore()}", font=("Calibri", 36), fg="#CD5C5C", bg="#E5DED2").pack()
 
+        # top scores of the level being played
+        if board:
+            tk.Label(p, text=f"Top {self.current_difficulty}, {self.game.baseLength} letters", font=("Calibri", 12, "bold"),
+                     bg="#E5DED2", fg="#232323").pack(pady=(10, 0))
+            rank = 1
+            for score, playedAt in board:
+                day = time.strftime("%Y-%m-%d", time.localtime(playedAt))
+                tk.Label(p, text=f"{rank}.  {score}   ({day})", font=("Calibri", 11),
+                         bg="#E5DED2", fg="#232323").pack()
+                rank += 1
+
     def openGameOverPopup(self, final_score):
         p = self._createCenteredPopup("Game Over", 300, 300)
 
@@ -474,11 +803,23 @@ class TextTwistUI:
                   cursor="heart", command=close).pack(pady=10, ipadx=30, ipady=3)
 
     def startGameSession(self):
+        # a size picked before the game object was made starts warming now
+        if self.game is not None and self.current_length != 6:
+            self.game.warmLength(self.current_length)
+        # dictionary or the picked size still loading in the background, try again shortly
+        if not self.isGameReady(self.current_difficulty, self.current_length):
+            self.main_start_btn.config(text="LOADING...", state="disabled")
+            self.__root.after(50, self.startGameSession)
+            return
+        self.main_start_btn.config(text="START GAME", state="normal")
+
+        self.ensureGamePage()
         self.start_page_frame.grid_remove()
         self.game_page_frame.grid()
         self.toggleKeyBindings(1)
 
-        self.game.startGame(self.current_difficulty)
+        self.game.startGame(self.current_difficulty, self.current_length)
+        self.resizeTiles(len(self.game.getLetters()))
         self.clearInputsAndTiles()
         self.updateTileDisplay(self.game.getLetters())
         self.clearSolutionGrid()
@@ -487,7 +828,8 @@ class TextTwistUI:
 
     def restartRound(self):
         self.game.resetGame()
-        self.game.startGame(self.current_difficulty)
+        self.game.startGame(self.current_difficulty, self.current_length)
+        self.resizeTiles(len(self.game.getLetters()))
         self.clearInputsAndTiles()
         self.updateTileDisplay(self.game.getLetters())
         self.clearSolutionGrid()
@@ -503,7 +845,11 @@ class TextTwistUI:
         self.level_status_label['text'] = ""
 
     def handleGameEnd(self):
-        self.__root.after(0, self._performGameOverSequence)
+        # called on the clock thread
+        self.events.post("game_end", self._performGameOverSequence)
+
+    def getEventQueueStats(self):
+        return self.events.getStats()
 
     def _performGameOverSequence(self):
         self.showMissingWords()
@@ -518,5 +864,12 @@ class TextTwistUI:
 
         self.openGameOverPopup(final_score)
 
+    # stops the game's background thread and clock before the window goes
+    def quitApp(self):
+        if self.game is not None:
+            self.game.close()
+        self.__root.destroy()
+
     def start_mainloop(self):
+        self.__root.protocol("WM_DELETE_WINDOW", self.quitApp)
         self.__root.mainloop()
\ No newline at end of file
@@ -0,0 +1,390 @@
+import os
+import json
+from bisect import bisect_left
+
+import words
+
+"""
+Dictionary patches for the lists made by words.py.
+    Adding or banning a word does not need a full build. patchDictionary
+    changes the word lists on disk, patches the loaded signature indexes and
+    the base word tables in place, and appends the change to patches.jsonl.
+    Every list is written to a temp file and swapped in with os.replace, so a
+    running game reads the old list or the new one, never half of one.
+    compactPatchLog makes a fresh full build from the source and the log,
+    checks it has the same words as the patched lists and then drops the
+    log. original_wordlist.txt is never written, so a later change of the
+    source rebuilds without compacted patches; until then, if the source
+    changes, or a list is made again because it is missing, the log is
+    applied again after the rebuild.
+    The paths and caches are the ones of the words module, pointing words
+    at other lists patches those.
+"""
+
+
+def patchLogFile():
+    return words.wordlistPath + "/patches.jsonl"
+
+
+# one patch word, upper case like the shipped lists
+def cleanPatchWord(word):
+    cleanWord = word.strip().upper()
+    if not cleanWord.isascii() or not cleanWord.isalpha():
+        raise ValueError("not a word: " + repr(word))
+    if len(cleanWord) < 3 or len(cleanWord) > words.maxBaseLength:
+        raise ValueError(cleanWord + " must have 3 to " + str(words.maxBaseLength) + " letters")
+    return cleanWord
+
+
+# (list file, shortest, longest word it holds), long mode lists only once made
+def patchTargets():
+    targets = [(words.allWordsPath, 3, 6), (words.sixLetterPath, 6, 6)]
+    if os.path.exists(words.longWordsPath()):
+        targets.append((words.longWordsPath(), 3, words.maxBaseLength))
+        for length in range(7, words.maxBaseLength + 1):
+            if os.path.exists(words.baseWordPath(length)):
+                targets.append((words.baseWordPath(length), length, length))
+    return targets
+
+
+def indexLineNumber(index, word, default):
+    for lineNumber, indexWord in index.get(words.letterSignature(word), ()):
+        if indexWord == word:
+            return lineNumber
+    return default
+
+
+# (position, line number) of the closest word from position on (step 1) or
+# back (step -1) that was in the index before this patch, line number None
+# if there is none
+def nearestIndexedWord(index, wordList, position, step, addedSet):
+    while 0 <= position < len(wordList):
+        if wordList[position] not in addedSet:
+            lineNumber = indexLineNumber(index, wordList[position], None)
+            if lineNumber is not None:
+                return position, lineNumber
+        position += step
+    return position, None
+
+
+# changes one loaded index to match the list after a patch
+def patchSignatureIndex(index, wordList, added, removed):
+    for word in removed:
+        entries = index.get(words.letterSignature(word), [])
+        entries[:] = [entry for entry in entries if entry[1] != word]
+        if not entries:
+            index.pop(words.letterSignature(word), None)
+
+    # new words next to each other have no line number to go by, so every
+    # group of them between the same two old words is spread evenly between
+    # those words' line numbers and answers still come back in file order
+    addedSet = set(added)
+    groups = []  # [line before, position after, line after, new words]
+    for position in sorted(bisect_left(wordList, word) for word in added):
+        if groups and position < groups[-1][1]:
+            groups[-1][3].append(wordList[position])
+            continue
+        beforeLine = nearestIndexedWord(index, wordList, position - 1, -1, addedSet)[1]
+        afterPosition, afterLine = nearestIndexedWord(index, wordList, position + 1, 1, addedSet)
+        groups.append([beforeLine, afterPosition, afterLine, [wordList[position]]])
+
+    for beforeLine, afterPosition, afterLine, groupWords in groups:
+        if beforeLine is None and afterLine is None:
+            beforeLine, afterLine = -1.0, float(len(groupWords))
+        elif beforeLine is None:
+            beforeLine = afterLine - len(groupWords) - 1
+        elif afterLine is None:
+            afterLine = beforeLine + len(groupWords) + 1
+        step = (afterLine - beforeLine) / (len(groupWords) + 1)
+        for i in range(len(groupWords)):
+            entries = index.setdefault(words.letterSignature(groupWords[i]), [])
+            entries.append((beforeLine + step * (i + 1), groupWords[i]))
+            entries.sort()
+
+
+# True if a patched index gives the same answers in the same order as one
+# built from the list file as it is now
+def verifySignatureIndex(index, filename):
+    entries = []
+    for signature, signatureEntries in index.items():
+        if signatureEntries != sorted(signatureEntries): return False
+        for lineNumber, word in signatureEntries:
+            if words.letterSignature(word) != signature: return False
+        entries.extend(signatureEntries)
+    entries.sort()
+    return [word for lineNumber, word in entries] == [word for word in words.readWordList(filename) if word.isalpha()]
+
+
+# bitmask of the letters in a word, a quick no for "does base contain word"
+def letterMask(word):
+    mask = 0
+    for ch in word:
+        mask |= 1 << (ord(ch) & 31)
+    return mask
+
+
+def letterCountMap(word):
+    counts = {}
+    for ch in word:
+        counts[ch] = counts.get(ch, 0) + 1
+    return counts
+
+
+# updates the rows of a base word table for the changed words only: the
+# answer counts move by one and rarity changes for the answers whose number
+# of base words changed, so no base word is solved again except new ones
+def patchBaseWordTable(table, index, oldAnswers, newAnswers, changedAnswers, addedBases, removedBases):
+    rows = table["words"]
+    changed = set(changedAnswers)
+    for baseWord in list(addedBases) + list(removedBases):
+        changed.update(words.findAnswers(index, baseWord, 1))
+    removedBaseSet = set(removedBases)
+
+    rowLetters = []
+    for row in rows:
+        rowLetters.append((letterMask(row[0]), letterCountMap(row[0])))
+
+    def contains(letters, word, wordMask, wordCounts):
+        if wordMask & ~letters[0]:
+            return False
+        for ch, count in wordCounts.items():
+            if letters[1].get(ch, 0) < count:
+                return False
+        return True
+
+    # how many base words each changed answer had before and has after
+    changedInfo = []
+    for word in changed:
+        wordMask, wordCounts = letterMask(word), letterCountMap(word)
+        oldCount = 0
+        newCount = 0
+        for row, letters in zip(rows, rowLetters):
+            if contains(letters, word, wordMask, wordCounts):
+                oldCount += 1
+                if row[0] not in removedBaseSet:
+                    newCount += 1
+        for baseWord in addedBases:
+            if contains((letterMask(baseWord), letterCountMap(baseWord)), word, wordMask, wordCounts):
+                newCount += 1
+        if word not in oldAnswers: oldCount = 0
+        if word not in newAnswers: newCount = 0
+        changedInfo.append((word, wordMask, wordCounts, oldCount, newCount))
+
+    keptRows = []
+    for row, letters in zip(rows, rowLetters):
+        if row[0] in removedBaseSet: continue
+        for word, wordMask, wordCounts, oldCount, newCount in changedInfo:
+            if not contains(letters, word, wordMask, wordCounts): continue
+            countChange = (1 if newCount else 0) - (1 if oldCount else 0)
+            rarityChange = (1.0 / newCount if newCount else 0.0) - (1.0 / oldCount if oldCount else 0.0)
+            for i in range(len(word)):
+                row[1][i] += countChange
+                row[2][i] = round(row[2][i] + rarityChange, 4)
+        keptRows.append(row)
+
+    newCounts = {}
+    for word, wordMask, wordCounts, oldCount, newCount in changedInfo:
+        newCounts[word] = newCount
+    for baseWord in addedBases:
+        # same as buildBaseWordRows, every answer of a new base word is a changed answer
+        lengthCounts = [0] * len(baseWord)
+        raritySums = [0.0] * len(baseWord)
+        for word in words.findAnswers(index, baseWord, 1):
+            lengthCounts[len(word) - 1] += 1
+            raritySums[len(word) - 1] += 1.0 / newCounts[word]
+        total = 0
+        rarityTotal = 0.0
+        for i in range(len(lengthCounts) - 1, -1, -1):
+            total += lengthCounts[i]
+            rarityTotal += raritySums[i]
+            lengthCounts[i] = total
+            raritySums[i] = round(rarityTotal, 4)
+        position = bisect_left([row[0] for row in keptRows], baseWord)
+        keptRows.insert(position, [baseWord, lengthCounts, raritySums])
+
+    table["words"] = keptRows
+    table["eligible"] = {}
+    table["stats"] = {}
+
+
+# adds and removes words in every list and loaded index, gives back
+# {list file: (added, removed)} for the lists that changed
+# where a new word goes so the list keeps the order the file already has:
+# before the first word that sorts after it, which is bisect on a sorted list
+def insertPosition(wordList, word):
+    position = bisect_left(wordList, word)
+    if (position == 0 or wordList[position - 1] < word) and (
+            position == len(wordList) or word < wordList[position]):
+        return position
+    # not sorted around there, walk the list instead
+    for position, listWord in enumerate(wordList):
+        if word < listWord:
+            return position
+    return len(wordList)
+
+
+# the patched list must hold exactly the old words, less the removed ones,
+# plus the added ones, once each; checked before anything is written
+def checkPatchedList(fileName, wordList, oldWords, added, removed):
+    expected = (oldWords - set(removed)) | set(added)
+    if len(wordList) != len(oldWords) - len(removed) + len(added) or set(wordList) != expected:
+        raise ValueError("patching " + fileName + " did not give the expected words, nothing was written")
+
+
+def patchDictionary(add=(), remove=(), writeLog=True):
+    addWords = [cleanPatchWord(word) for word in add]
+    removeWords = [cleanPatchWord(word) for word in remove]
+    if set(addWords) & set(removeWords):
+        raise ValueError("a word can not be added and removed at once")
+    words.checkSourceIsUnchanged()
+
+    targets = patchTargets()
+    # tables already built are patched, the others are built when first used
+    tables = []
+    for baseFile, answersFile in [(words.sixLetterPath, words.allWordsPath)] + [
+            (fileName, words.longWordsPath()) for fileName, shortest, longest in targets[3:]]:
+        if (baseFile, answersFile) in words.baseWordTableCache or os.path.exists(words.baseWordTablePath(baseFile)):
+            tables.append((baseFile, answersFile, words.loadBaseWordTable(baseFile, answersFile)))
+
+    changes = {}
+    oldSets = {}
+    patchedLists = {}
+    for fileName, shortest, longest in targets:
+        wordList = words.readWordList(fileName)
+        present = set(wordList)
+        oldSets[fileName] = set(present)
+        added = []
+        removed = []
+        for word in removeWords:
+            if word in present:
+                present.discard(word)
+                # the exact line, a near match from a search would drop a neighbour
+                del wordList[wordList.index(word)]
+                removed.append(word)
+        for word in addWords:
+            if len(word) < shortest or len(word) > longest: continue
+            if word not in present:
+                present.add(word)
+                wordList.insert(insertPosition(wordList, word), word)
+                added.append(word)
+        if not added and not removed: continue
+        checkPatchedList(fileName, wordList, oldSets[fileName], added, removed)
+        patchedLists[fileName] = wordList
+        changes[fileName] = (added, removed)
+
+    for fileName, wordList in patchedLists.items():
+        added, removed = changes[fileName]
+        # the loaded index is only patched if it matches the file being replaced
+        cached = words.signatureIndexCache.get(fileName)
+        upToDate = cached is not None and cached[0] == words.fileStamp(fileName)
+        words.writeWordListFile(fileName, wordList)
+        if upToDate:
+            patchSignatureIndex(cached[1], wordList, added, removed)
+            words.signatureIndexCache[fileName] = (words.fileStamp(fileName), cached[1])
+
+    for baseFile, answersFile, table in tables:
+        if baseFile not in changes and answersFile not in changes: continue
+        baseAdded, baseRemoved = changes.get(baseFile, ([], []))
+        answersAdded, answersRemoved = changes.get(answersFile, ([], []))
+        index = words.buildSignatureIndex(answersFile)
+        patchBaseWordTable(table, index, oldSets[answersFile], set(words.readWordList(answersFile)),
+                           answersAdded + answersRemoved, baseAdded, baseRemoved)
+        hashes = [words.fileHash(baseFile), words.fileHash(answersFile)]
+        words.saveBaseWordTable(words.baseWordTablePath(baseFile), hashes, table["words"])
+        stamps = (words.fileStamp(baseFile), words.fileStamp(answersFile))
+        words.baseWordTableCache[(baseFile, answersFile)] = (stamps, table)
+
+    if writeLog and changes:
+        f = open(patchLogFile(), "a")
+        for word in removeWords:
+            f.write(json.dumps({"op": "remove", "word": word}) + "\n")
+        for word in addWords:
+            f.write(json.dumps({"op": "add", "word": word}) + "\n")
+        f.close()
+    return changes
+
+
+# net effect of the log: (words to add, words to remove), the last entry of a word wins
+def readPatchLog():
+    netOps = {}
+    try:
+        f = open(patchLogFile(), "r")
+        for line in f:
+            if not line.strip(): continue
+            entry = json.loads(line)
+            netOps[entry["word"]] = entry["op"]
+        f.close()
+    except OSError:
+        pass
+    addWords = sorted(word for word, op in netOps.items() if op == "add")
+    removeWords = sorted(word for word, op in netOps.items() if op == "remove")
+    return addWords, removeWords
+
+
+# puts the logged patches back on lists that were just rebuilt from the source
+def applyPatchLog():
+    addWords, removeWords = readPatchLog()
+    if addWords or removeWords:
+        patchDictionary(addWords, removeWords, writeLog=False)
+
+
+# the patched lists built again from the source plus the net patches,
+# {list file: sorted words}, with the same filter as every other build
+def buildPatchedLists(addWords, removeWords):
+    targets = patchTargets()
+    wordSets = {}
+    for fileName, shortest, longest in targets:
+        wordSets[fileName] = set()
+
+    f = open(words.sourcePath, "r")
+    for line in f:
+        cleanWord = words.cleanSourceWord(line)
+        if cleanWord is None: continue
+        for fileName, shortest, longest in targets:
+            if shortest <= len(cleanWord) <= longest:
+                wordSets[fileName].add(cleanWord)
+    f.close()
+
+    lists = {}
+    for fileName, shortest, longest in targets:
+        wordSet = wordSets[fileName]
+        wordSet.difference_update(removeWords)
+        for word in addWords:
+            if shortest <= len(word) <= longest:
+                wordSet.add(word)
+        lists[fileName] = sorted(wordSet)
+    return lists
+
+
+# makes a fresh full build of the patched lists from the source and the
+# log and, if it has the same words as the lists on disk, writes it, rebuilds
+# dictionary.bin and the saved tables and only then removes the log
+def compactPatchLog():
+    addWords, removeWords = readPatchLog()
+    if not addWords and not removeWords:
+        return False
+    words.checkSourceIsUnchanged()
+
+    rebuilt = buildPatchedLists(addWords, removeWords)
+    for fileName, wordList in rebuilt.items():
+        if set(wordList) != set(words.readWordList(fileName)):
+            raise ValueError(os.path.basename(fileName) + " does not match a build from the source "
+                             "and the patch log, the log is kept")
+
+    for fileName, wordList in rebuilt.items():
+        words.writeWordListFile(fileName, wordList)
+    words.compileWordListFile(words.fileHash(words.sourcePath), words.allWordsPath, words.compiledDictionaryPath)
+    header = words.readCompiledHeader(words.compiledDictionaryPath)
+    if header is None or header["listHash"] != words.fileHash(words.allWordsPath):
+        raise OSError("could not build " + words.compiledDictionaryPath + ", the log is kept")
+
+    # saved tables are made again from scratch instead of carrying the patches
+    for baseFile in [words.sixLetterPath] + [words.baseWordPath(length) for length in range(7, words.maxBaseLength + 1)]:
+        if baseFile not in rebuilt or not os.path.exists(words.baseWordTablePath(baseFile)): continue
+        answersFile = words.answersFileFor(baseFile)
+        words.baseWordTableCache.pop((baseFile, answersFile), None)
+        hashes = [words.fileHash(baseFile), words.fileHash(answersFile)]
+        words.saveBaseWordTable(words.baseWordTablePath(baseFile), hashes, words.buildBaseWordRows(baseFile, answersFile))
+
+    os.remove(patchLogFile())
+    return True
@@ -1,5 +1,25 @@
 import random
 import os
+import sys
+import json
+import mmap
+import struct
+import time
+import heapq
+import hashlib
+import argparse
+import atexit
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+
+# numpy is only needed for the batch solver, it is imported on first use
+# (see loadNumpy) so starting the game does not pay for it
+np = None
+from itertools import combinations
+from bisect import bisect_left, bisect_right
 
 """
 Handles all word-related tasks in the game.
@@ -19,13 +39,69 @@ wordlistPath = currentFolder + "/wordlists"
 sourcePath = wordlistPath + "/original_wordlist.txt"
 sixLetterPath = wordlistPath + "/6letterwords.txt"
 allWordsPath = wordlistPath + "/allwords.txt"
+compiledDictionaryPath = wordlistPath + "/dictionary.bin"
+
+# longer puzzles (7 to maxBaseLength letters) use their own lists made from the
+# source: {n}letterwords.txt for the base words and allwordslong.txt for the
+# answers (3 to maxBaseLength letters, longer words never fit a shorter base)
+maxBaseLength = 9
+
+# rough memory the streaming build may use for words before spilling to disk
+streamMemoryLimit = 64 * 1024 * 1024
+
+# shortest answer allowed for each difficulty
+difficultyMinLength = {"EASY": 3, "HARD": 5}
+
+# a base word needs at least this many answers to be picked
+minimumAnswers = 10
+
+# memory the dictionary registry may use for loaded indexes and compiled
+# lists before it drops the least recently used dictionary (rough
+# estimate, see estimateSize)
+dictionaryMemoryBudget = 64 * 1024 * 1024
+
+# answer sets kept by the answer cache (anagram base words share one entry),
+# and where they are saved between runs (unset = memory only)
+answerCacheSize = 4096
+answerCachePath = os.environ.get("TEXTTWIST_ANSWER_CACHE", "")
+
+# loaded indexes are kept here so the file is only read again when it changes
+signatureIndexCache = {}
+baseWordTableCache = {}
+compiledDictionaryCache = {}
+letterMatrixCache = {}
+sourceCheckCache = {}
+wordStoreCache = {}
+
+
+# cleans one line of the source, gives None if the word is not usable.
+# One rule for every list (6 letter and long): no capitalised names (eBay
+# and kHz stay, they start lower case), no accents, stored upper case.
+# This gives the shipped lists back exactly
+def cleanSourceWord(line):
+    cleanWord = line.strip()
+    #this filter words with apostrophe
+    if "'" in cleanWord: return None
+    if not cleanWord.isascii() or not cleanWord.isalpha(): return None
+    if not cleanWord[0].islower(): return None
+    return cleanWord.upper()
 
 
 # function to make the list files if missing
-def generateWordListsFromSource():
+# streaming=True sorts in chunks on disk, for source lists too big for memory
+def generateWordListsFromSource(streaming=False, memoryLimit=streamMemoryLimit):
     if not os.path.exists(wordlistPath):
         os.makedirs(wordlistPath)
 
+    # the paths are passed on, defaults were bound at import and would
+    # miss the module paths being pointed somewhere else
+    if streaming:
+        try:
+            streamWordListsFromSource(sourcePath, memoryLimit)
+        except OSError:
+            print("error finding source file,,, check folder")
+        return
+
     try:
         # reading the source file manually
         f = open(sourcePath, "r")
@@ -33,10 +109,8 @@ def generateWordListsFromSource():
         allWordsList = []
 
         for line in f:
-            cleanWord = line.strip().lower()
-            #this filter words with apostrophe
-            if "'" in cleanWord: continue
-            if not cleanWord.isalpha(): continue
+            cleanWord = cleanSourceWord(line)
+            if cleanWord is None: continue
 
             # sort words by length -
             length = len(cleanWord)
@@ -46,28 +120,251 @@ def generateWordListsFromSource():
                 sixLetterList.append(cleanWord)
         f.close()
 
-        # writing the 6 letter file
-        f2 = open(sixLetterPath, "w")
+        # writing the 6 letter file, swapped in whole so a running game never
+        # reads half of it
         # making it unique set then list and sort
         uniqueSix = sorted(list(set(sixLetterList)))
-        f2.write("\n".join(uniqueSix))
-        f2.close()
+        writeWordListFile(sixLetterPath, uniqueSix)
 
         # writing all words file
-        f3 = open(allWordsPath, "w")
         uniqueAll = sorted(list(set(allWordsList)))
-        f3.write("\n".join(uniqueAll))
-        f3.close()
+        writeWordListFile(allWordsPath, uniqueAll)
+
+        # compiled copy of the new list, remembering which source it came from
+        compileDictionary(uniqueAll, fileHash(sourcePath), fileHash(allWordsPath), compiledDictionaryPath)
 
     except:
         print("error finding source file,,, check folder")
 
 
+"""
+Streaming build
+    Same output as generateWordListsFromSource, byte for byte, but memory stays
+    around memoryLimit no matter how big the source is:
+        1. read the source, keep words in two buffers (6 letter / all)
+        2. when the buffers get too big, sort + dedupe them and write them to a
+           temp file ("run"), then empty them
+        3. merge all runs with heapq.merge (k-way merge), skipping repeats
+"""
+
+
+class SortedRunWriter:
+    def __init__(self, tempDir, name):
+        self.tempDir = tempDir
+        self.name = name
+        self.buffer = set()
+        self.runPaths = []
+
+    def add(self, word):
+        self.buffer.add(word)
+
+    # writes the buffer as one sorted run file
+    def spill(self):
+        if not self.buffer:
+            return
+        runPath = os.path.join(self.tempDir, self.name + str(len(self.runPaths)) + ".txt")
+        f = open(runPath, "w")
+        for word in sorted(self.buffer):
+            f.write(word + "\n")
+        f.close()
+        self.runPaths.append(runPath)
+        self.buffer = set()
+
+    # merges all runs into outPath, no repeats, one word per line
+    def mergeInto(self, outPath):
+        self.spill()
+        runFiles = []
+        for runPath in self.runPaths:
+            runFiles.append(open(runPath, "r"))
+
+        def mergedLines():
+            lastWord = None
+            for line in heapq.merge(*runFiles):
+                word = line[:-1]
+                if word == lastWord: continue
+                yield word + "\n"
+                lastWord = word
+
+        try:
+            writeFileAtomically(outPath, mergedLines())
+        finally:
+            for runFile in runFiles:
+                runFile.close()
+
+
+# estimate of the memory one buffered word takes (string + set slot)
+def bufferedWordSize(word):
+    return sys.getsizeof(word) + 32
+
+
+def streamWordListsFromSource(source=sourcePath, memoryLimit=streamMemoryLimit, reportEvery=500000):
+    tempDir = tempfile.mkdtemp(prefix="texttwist_build_")
+    try:
+        sixRuns = SortedRunWriter(tempDir, "six")
+        allRuns = SortedRunWriter(tempDir, "all")
+        bufferedBytes = 0
+
+        startTime = time.perf_counter()
+        lineCount = 0
+        f = open(source, "r")
+        for line in f:
+            lineCount += 1
+            if lineCount % reportEvery == 0:
+                reportBuildSpeed(lineCount, startTime)
+
+            cleanWord = cleanSourceWord(line)
+            if cleanWord is None: continue
+
+            length = len(cleanWord)
+            if length >= 3 and length <= 6:
+                allRuns.add(cleanWord)
+                bufferedBytes += bufferedWordSize(cleanWord)
+            if length == 6:
+                sixRuns.add(cleanWord)
+                bufferedBytes += bufferedWordSize(cleanWord)
+
+            # too much in memory, write the sorted chunks out
+            if bufferedBytes >= memoryLimit:
+                sixRuns.spill()
+                allRuns.spill()
+                bufferedBytes = 0
+        f.close()
+        reportBuildSpeed(lineCount, startTime)
+
+        sixRuns.mergeInto(sixLetterPath)
+        allRuns.mergeInto(allWordsPath)
+    finally:
+        for name in os.listdir(tempDir):
+            os.remove(os.path.join(tempDir, name))
+        os.rmdir(tempDir)
+
+    # the compiled copy reads the merged file back one line at a time
+    compileWordListFile(fileHash(source), allWordsPath, compiledDictionaryPath)
+
+
+def reportBuildSpeed(lineCount, startTime):
+    seconds = max(time.perf_counter() - startTime, 1e-9)
+    print("read " + str(lineCount) + " lines, " + str(int(lineCount / seconds)) + " lines/sec")
+
+
+# base word list for a puzzle length
+def baseWordPath(length=6):
+    if length == 6:
+        return sixLetterPath
+    if length < 6 or length > maxBaseLength:
+        raise ValueError("puzzle length must be between 6 and " + str(maxBaseLength))
+    return wordlistPath + "/" + str(length) + "letterwords.txt"
+
+
+def longWordsPath():
+    return wordlistPath + "/allwordslong.txt"
+
+
+# answer list that goes with a base word list
+def answersFileFor(filename):
+    if filename == sixLetterPath or filename == allWordsPath:
+        return allWordsPath
+    for length in range(7, maxBaseLength + 1):
+        if filename == baseWordPath(length):
+            return longWordsPath()
+    return allWordsPath
+
+
+# lists that validate_file_name knows how to make
+def isGeneratedList(fileName):
+    return fileName in (sixLetterPath, allWordsPath) or isLongListFile(fileName)
+
+
+def isLongListFile(fileName):
+    if fileName == longWordsPath():
+        return True
+    for length in range(7, maxBaseLength + 1):
+        if fileName == baseWordPath(length):
+            return True
+    return False
+
+
+# makes the lists for 7 to maxBaseLength letter puzzles from the source
+def generateLongWordLists():
+    if not os.path.exists(wordlistPath):
+        os.makedirs(wordlistPath)
+
+    try:
+        f = open(sourcePath, "r")
+        baseLists = {}
+        for length in range(7, maxBaseLength + 1):
+            baseLists[length] = set()
+        answerSet = set()
+        for line in f:
+            cleanWord = cleanSourceWord(line)
+            if cleanWord is None: continue
+
+            length = len(cleanWord)
+            if length >= 3 and length <= maxBaseLength:
+                answerSet.add(cleanWord)
+            if length in baseLists:
+                baseLists[length].add(cleanWord)
+        f.close()
+
+        for length, wordSet in baseLists.items():
+            writeWordListFile(baseWordPath(length), sorted(wordSet))
+        writeWordListFile(longWordsPath(), sorted(answerSet))
+
+    except OSError:
+        print("error finding source file,,, check folder")
+
+
+# writes the chunks (str, or bytes with mode "wb") to a temp file and swaps
+# it in with os.replace, so a reader gets the old file or the new one and a
+# crash never leaves half of one. The temp name has the thread id, the
+# prefetcher may save the same file as the game at the same time
+def writeFileAtomically(path, chunks, mode="w"):
+    tempPath = path + "." + str(threading.get_ident()) + ".tmp"
+    try:
+        f = open(tempPath, mode)
+        try:
+            for chunk in chunks:
+                f.write(chunk)
+        finally:
+            f.close()
+        os.replace(tempPath, path)
+    except OSError:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
+
+
+# lists made again from the source lost their patches, the log in
+# wordpatch puts them back (imported here, wordpatch imports this module)
+def reapplyPatchLog():
+    import wordpatch
+    wordpatch.applyPatchLog()
+
+
+# one word per line like the other lists
+def writeWordListFile(fileName, wordList):
+    writeFileAtomically(fileName, ["".join(word + "\n" for word in wordList)])
+
+
+def readWordList(fileName):
+    f = open(fileName, "r")
+    wordList = [line.strip() for line in f if line.strip()]
+    f.close()
+    return wordList
+
+
 # helper to check file exist
 def validate_file_name(fileNameInput):
     if not os.path.exists(fileNameInput):
         print("missing file.. generating now")
-        generateWordListsFromSource()
+        if isLongListFile(fileNameInput):
+            generateLongWordLists()
+        else:
+            generateWordListsFromSource()
+        # the new lists come from the source alone, the patches go back on
+        reapplyPatchLog()
+    elif fileNameInput == allWordsPath or fileNameInput == sixLetterPath or isLongListFile(fileNameInput):
+        checkSourceIsUnchanged()
 
 
 
@@ -86,44 +383,1043 @@ def manualCheckLetters(baseWordString, testWordString):
     return True
 
 
-def getBaseWord(min_length=3, filename=sixLetterPath):
+# dictionary: a WordDictionary from a DictionaryRegistry, its lists are used
+# instead of filename / answersFile
+def getBaseWord(min_length=3, filename=sixLetterPath, answersFile=None, dictionary=None):
+    if dictionary is not None:
+        dictionary.use()
+        filename, answersFile = dictionary.baseFile, dictionary.answersFile
+    if answersFile is None:
+        answersFile = answersFileFor(filename)
+    table = loadBaseWordTable(filename, answersFile)
+
+    # the words that qualify for each min length are worked out once
+    eligibleList = table["eligible"].get(min_length)
+    if eligibleList is None:
+        eligibleList = []
+        for row in table["words"]:
+            if countForMinLength(row[1], min_length) >= minimumAnswers:
+                eligibleList.append(row[0])
+        table["eligible"][min_length] = eligibleList
+
+    if not eligibleList:
+        raise ValueError("no base word in " + filename + " has " + str(minimumAnswers)
+                         + " answers of length " + str(min_length) + " or more")
+
+    # picking random word, every word in the list already has enough answers
+    return random.choice(eligibleList)
+
+
+# key for a word: its letters in sorted order, so all anagrams share one key
+def letterSignature(word):
+    return "".join(sorted(word))
+
+
+# helper to tell if a file changed since the last time we read it
+def fileStamp(fileName):
+    info = os.stat(fileName)
+    return (info.st_mtime_ns, info.st_size)
+
+
+# builds the sub-anagram index: sorted letters -> list of (line number, word)
+# the line number is kept so results come back in the same order as the file,
+# it counts words only (no blank lines) like the compiled dictionary it is read from
+def buildSignatureIndex(filename=allWordsPath):
+    validate_file_name(filename)
+
+    stamp = fileStamp(filename)
+    cached = signatureIndexCache.get(filename)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    # one bulk read of the compiled file instead of parsing the text list,
+    # which is compiled again first if it changed
+    compiled = loadCompiledDictionary(filename=filename, path=compiledPathFor(filename))
+    index = {}
+    for lineNumber in range(len(compiled)):
+        checkWord = compiled.getWord(lineNumber)
+        if checkWord.isalpha():
+            index.setdefault(letterSignature(checkWord), []).append((lineNumber, checkWord))
+
+    signatureIndexCache[filename] = (stamp, index)
+    return index
+
+
+# useCache=False skips the answer cache, for one-off scans over every base word
+def generateValidWordsFromBaseWord(base_word, min_length=3, filename=allWordsPath, dictionary=None,
+                                   useCache=True):
+    if dictionary is not None:
+        dictionary.use()
+        filename = dictionary.answersFile
+    index = buildSignatureIndex(filename)
+
+    # the stamp the index was built from is the list version, None if the
+    # registry dropped the index meanwhile
+    indexEntry = signatureIndexCache.get(filename)
+    if useCache and indexEntry is not None:
+        # anagrams of the base word have the same answers, one cache entry for all
+        key = (filename, indexEntry[0], letterSignature(base_word), min_length)
+        cached = answerCache.get(key)
+        if cached is None:
+            cached = tuple(findAnswers(index, base_word, min_length))
+            answerCache.put(key, cached)
+        # the cache keeps a tuple, callers get their own list
+        return list(cached)
+    return findAnswers(index, base_word, min_length)
+
+
+def findAnswers(index, base_word, min_length):
+    # every answer is made from some of the base letters, so instead of
+    # scanning the whole file we look up each sub-multiset of the letters
+    # (at most 2^6 for a 6 letter word) in the index
+    sortedLetters = sorted(base_word)
+    foundList = []
+    seenCombos = set()
+    for size in range(max(min_length, 1), len(sortedLetters) + 1):
+        # combinations of a sorted list are sorted too, so they are signatures
+        for combo in combinations(sortedLetters, size):
+            if combo in seenCombos: continue
+            seenCombos.add(combo)
+            foundList.extend(index.get("".join(combo), ()))
+
+    # back to file order, same as the old full scan
+    foundList.sort()
+    resultList = []
+    for lineNumber, word in foundList:
+        resultList.append(word)
+    return resultList
+
+
+"""
+Answer cache
+    Every anagram of a base word has the same answers, so answer sets are
+    kept by (answer file, file version, sorted letters, min length) in a
+    bounded least recently used map. The file version is its stamp, so an
+    edited list never gives old answers. With TEXTTWIST_ANSWER_CACHE set the
+    entries are saved to that file at exit and loaded on first use; saved
+    entries are tied to the sha1 of the list instead of the stamp.
+"""
+
+
+#Class for the bounded answer set cache, values are tuples so a caller can not change them
+class AnswerCache:
+    def __init__(self, maxEntries=answerCacheSize, path=""):
+        self.maxEntries = maxEntries
+        self.path = path
+        self.entries = OrderedDict()  # key -> answers tuple, oldest use first
+        self.lock = threading.Lock()  # the round prefetcher calls in from its own thread
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.diskLoaded = not path
+
+    def get(self, key):
+        if not self.diskLoaded:
+            self.loadFromDisk()
+        with self.lock:
+            answers = self.entries.get(key)
+            if answers is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return answers
+
+    def put(self, key, answers):
+        with self.lock:
+            self.entries[key] = tuple(answers)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def getStats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "maxEntries": self.maxEntries, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0}
+
+    # saved as {"files": {answer file: sha1}, "entries": [[file, letters, min length, answers]]}
+    def saveToDisk(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with self.lock:
+            items = list(self.entries.items())
+        files = {}
+        rows = []
+        for (filename, stamp, signature, min_length), answers in items:
+            try:
+                if filename not in files:
+                    # only entries made from the file as it is now
+                    if fileStamp(filename) != stamp:
+                        continue
+                    files[filename] = fileHash(filename)
+            except OSError:
+                continue
+            rows.append([filename, signature, min_length, list(answers)])
+        try:
+            writeFileAtomically(path, [json.dumps({"files": files, "entries": rows})])
+        except OSError:
+            print("could not save answer cache to " + path)
+
+    def loadFromDisk(self, path=None):
+        path = path or self.path
+        self.diskLoaded = True
+        try:
+            f = open(path, "r")
+            saved = json.load(f)
+            f.close()
+            # a saved list that changed since is dropped, the rest get today's stamp
+            stamps = {}
+            for filename, digest in saved["files"].items():
+                if os.path.exists(filename) and fileHash(filename) == digest:
+                    stamps[filename] = fileStamp(filename)
+            with self.lock:
+                for filename, signature, min_length, answers in saved["entries"][-self.maxEntries:]:
+                    if filename in stamps:
+                        self.entries.setdefault((filename, stamps[filename], signature, min_length),
+                                                tuple(answers))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+
+answerCache = AnswerCache(answerCacheSize, answerCachePath)
+if answerCachePath:
+    atexit.register(answerCache.saveToDisk)
+
+
+# counts[i] is how many answers are at least i + 1 letters long
+def countForMinLength(counts, min_length):
+    if min_length <= 1:
+        return counts[0] if counts else 0
+    if min_length > len(counts):
+        return 0
+    return counts[min_length - 1]
+
+
+# total score of a puzzle: one point per letter of every answer of min_length or more
+def scoreForMinLength(counts, min_length):
+    score = 0
+    for length in range(max(min_length, 1), len(counts) + 1):
+        exactCount = counts[length - 1]
+        if length < len(counts):
+            exactCount -= counts[length]
+        score += length * exactCount
+    return score
+
+
+# average rarity of the answers of min_length or more, 1.0 = no other base word has them
+def rarityForMinLength(counts, raritySums, min_length):
+    count = countForMinLength(counts, min_length)
+    if count == 0:
+        return 0.0
+    return countForMinLength(raritySums, min_length) / count
+
+
+"""
+Puzzle stats index
+    For each min length the base words that have enough answers are kept
+    sorted by total score, so a puzzle in a score band is two bisects and a
+    random pick between them instead of drawing words until one fits.
+"""
+
+
+#Class for the sorted stats of one base word list at one min length
+class PuzzleStatsIndex:
+    def __init__(self, wordRows, min_length):
+        self.min_length = min_length
+        self.rows = {}  # base word -> its table row
+        entries = []
+        for row in wordRows:
+            if countForMinLength(row[1], min_length) >= minimumAnswers:
+                entries.append((scoreForMinLength(row[1], min_length), row[0]))
+                self.rows[row[0]] = row
+        entries.sort()
+        self.scores = [score for score, word in entries]
+        self.words = [word for score, word in entries]
+
+    def __len__(self):
+        return len(self.words)
+
+    # (first, end) positions of the base words scoring lowScore..highScore
+    def bandRange(self, lowScore, highScore):
+        return bisect_left(self.scores, lowScore), bisect_right(self.scores, highScore)
+
+    def countInBand(self, lowScore, highScore):
+        first, end = self.bandRange(lowScore, highScore)
+        return max(end - first, 0)
+
+    # random base word with a total score in the band, None if no word fits
+    def pickInBand(self, lowScore, highScore, rng=random):
+        first, end = self.bandRange(lowScore, highScore)
+        if end <= first:
+            return None
+        return self.words[rng.randrange(first, end)]
+
+    # base words at a fraction of the way through the score order, 0.0 easiest,
+    # 1.0 hardest; for bands that should follow the list, not fixed scores
+    def scoreAtPercentile(self, fraction):
+        if not self.scores:
+            return 0
+        position = min(int(fraction * len(self.scores)), len(self.scores) - 1)
+        return self.scores[max(position, 0)]
+
+    def getStats(self, baseWord):
+        row = self.rows.get(baseWord)
+        if row is None:
+            return None
+        counts = row[1]
+        byLength = {}
+        for length in range(self.min_length, len(counts) + 1):
+            exactCount = counts[length - 1] - (counts[length] if length < len(counts) else 0)
+            if exactCount:
+                byLength[length] = exactCount
+        return {"word": baseWord, "countsByLength": byLength,
+                "answers": countForMinLength(counts, self.min_length),
+                "totalScore": scoreForMinLength(counts, self.min_length),
+                "rarity": round(rarityForMinLength(counts, row[2], self.min_length), 4)}
+
+
+def loadPuzzleStats(min_length=3, filename=sixLetterPath, answersFile=None, dictionary=None):
+    if dictionary is not None:
+        dictionary.use()
+        filename, answersFile = dictionary.baseFile, dictionary.answersFile
+    if answersFile is None:
+        answersFile = answersFileFor(filename)
+    table = loadBaseWordTable(filename, answersFile)
+
+    statsIndex = table["stats"].get(min_length)
+    if statsIndex is None:
+        statsIndex = PuzzleStatsIndex(table["words"], min_length)
+        table["stats"][min_length] = statsIndex
+    return statsIndex
+
+
+# like getBaseWord, but only base words whose total score is lowScore..highScore
+def getBaseWordInScoreBand(lowScore, highScore, min_length=3, filename=sixLetterPath,
+                           answersFile=None, dictionary=None):
+    statsIndex = loadPuzzleStats(min_length, filename, answersFile, dictionary)
+    baseWord = statsIndex.pickInBand(lowScore, highScore)
+    if baseWord is None:
+        raise ValueError("no base word scores between " + str(lowScore) + " and " + str(highScore)
+                         + " with answers of length " + str(min_length) + " or more")
+    return baseWord
+
+
+# hash of the file content, used to tell if a saved table is out of date
+def fileHash(fileName):
+    f = open(fileName, "rb")
+    digest = hashlib.sha1(f.read()).hexdigest()
+    f.close()
+    return digest
+
+
+# bumped when the rows change shape, older saved tables are rebuilt
+baseWordTableVersion = 2
+
+
+# the saved table sits next to the base word list
+def baseWordTablePath(filename):
+    return os.path.splitext(filename)[0] + "_table.json"
+
+
+# answer counts and rarity for every base word, saved to disk and rebuilt if the lists change
+# each row is [base word, counts, rarity sums], see buildBaseWordRows
+def loadBaseWordTable(filename=sixLetterPath, answersFile=allWordsPath):
     validate_file_name(filename)
+    validate_file_name(answersFile)
+
+    # same files as last time, nothing to do
+    stamps = (fileStamp(filename), fileStamp(answersFile))
+    cached = baseWordTableCache.get((filename, answersFile))
+    if cached is not None and cached[0] == stamps:
+        return cached[1]
+
+    hashes = [fileHash(filename), fileHash(answersFile)]
+    tablePath = baseWordTablePath(filename)
+    wordRows = None
+    try:
+        f = open(tablePath, "r")
+        saved = json.load(f)
+        f.close()
+        if saved.get("hashes") == hashes and saved.get("version") == baseWordTableVersion:
+            wordRows = saved["words"]
+    except (OSError, ValueError, KeyError):
+        wordRows = None
+
+    if wordRows is None:
+        wordRows = buildBaseWordRows(filename, answersFile)
+        saveBaseWordTable(tablePath, hashes, wordRows)
 
+    table = {"words": wordRows, "eligible": {}, "stats": {}}
+    baseWordTableCache[(filename, answersFile)] = (stamps, table)
+    return table
+
+
+# counts[i] is how many answers are at least i + 1 letters long, rarity[i] is
+# the sum of 1 / (base words the answer appears under) over those answers,
+# so an answer only this base word has adds 1 and a common one adds little
+def buildBaseWordRows(filename, answersFile):
     f = open(filename, "r")
     lines = f.readlines()
     f.close()
 
-    cleanList = []
-    for w in lines:
-        if w.strip().isalpha():
-            cleanList.append(w.strip())
+    # first pass: answers of every base word, and how many base words share each answer
+    answerLists = []
+    appearances = {}
+    for line in lines:
+        baseWord = line.strip()
+        if not baseWord.isalpha(): continue
+        answers = generateValidWordsFromBaseWord(baseWord, 1, answersFile, useCache=False)
+        answerLists.append((baseWord, answers))
+        for word in answers:
+            appearances[word] = appearances.get(word, 0) + 1
 
-    while True:
-        # picking random word
-        randomBaseWord = random.choice(cleanList)
+    wordRows = []
+    for baseWord, answers in answerLists:
+        # count the answers by length, then add up from the longest down
+        lengthCounts = [0] * len(baseWord)
+        raritySums = [0.0] * len(baseWord)
+        for word in answers:
+            lengthCounts[len(word) - 1] += 1
+            raritySums[len(word) - 1] += 1.0 / appearances[word]
+        total = 0
+        rarityTotal = 0.0
+        for i in range(len(lengthCounts) - 1, -1, -1):
+            total += lengthCounts[i]
+            rarityTotal += raritySums[i]
+            lengthCounts[i] = total
+            raritySums[i] = round(rarityTotal, 4)
+        wordRows.append([baseWord, lengthCounts, raritySums])
+    return wordRows
 
-        # checking if it has enough answers
-        validList = generateValidWordsFromBaseWord(randomBaseWord, min_length)
-        # minimum 10 words required
-        if len(validList) >= 10:
-            return randomBaseWord
 
+def saveBaseWordTable(tablePath, hashes, wordRows):
+    # dumps then one write, json.dump writes piece by piece and is much slower
+    try:
+        data = json.dumps({"version": baseWordTableVersion, "hashes": hashes, "words": wordRows})
+        writeFileAtomically(tablePath, [data])
+    except OSError:
+        print("could not save base word table,,, it will be rebuilt next time")
 
-def generateValidWordsFromBaseWord(base_word, min_length=3, filename=allWordsPath):
-    validate_file_name(filename)
 
-    resultList = []
+"""
+Dictionary registry
+    Several word lists can be served from one process (languages, a family
+    list, a tournament list). Each one is registered by name with its base
+    word list and answer list, and nothing is read until it is first used.
+    Loaded indexes live in the caches above; when the total estimated size is
+    over the memory budget the least recently used dictionaries are dropped
+    from the caches and load again on their next use.
+        registry = DictionaryRegistry()
+        family = registry.register("family", "lists/family6.txt", "lists/familyall.txt")
+        getBaseWord(3, dictionary=family)
+"""
+
+
+# rough bytes used by a loaded index or table (str, list, tuple, dict only)
+def estimateSize(obj):
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return size
+
+
+#Class for one registered dictionary, the handle passed to getBaseWord and
+#generateValidWordsFromBaseWord
+class WordDictionary:
+    def __init__(self, name, baseFile, answersFile, registry=None):
+        self.name = name
+        self.baseFile = baseFile
+        self.answersFile = answersFile
+        self.registry = registry
+        self.loaded = False
+        self.indexSize = 0
+        self.tableSize = 0
+        self.compiledSize = 0
+
+    # called before every lookup, loads on first use and marks it recently used
+    def use(self):
+        if self.registry is not None:
+            self.registry.use(self)
+        elif not self.loaded:
+            self.load()
+
+    def load(self):
+        for fileName in (self.baseFile, self.answersFile):
+            # only the game's own lists can be generated, a missing custom list is an error
+            if not os.path.exists(fileName) and not isGeneratedList(fileName):
+                raise FileNotFoundError("word list of dictionary " + self.name + " not found: " + fileName)
+        index = buildSignatureIndex(self.answersFile)
+        table = loadBaseWordTable(self.baseFile, self.answersFile)
+        # the index is built from the compiled list, which stays loaded with it
+        compiled = loadCompiledDictionary(filename=self.answersFile, path=compiledPathFor(self.answersFile))
+        self.indexSize = estimateSize(index)
+        self.tableSize = estimateSize(table["words"])
+        self.compiledSize = len(compiled.buffer)
+        self.loaded = True
+
+    # drops the loaded indexes, they are read again on the next use.
+    # dropIndex=False keeps everything made from the answer list (index,
+    # compiled list read or mapped, letter matrix, word stores) for a
+    # dictionary that shares it
+    def unload(self, dropIndex=True):
+        if dropIndex:
+            signatureIndexCache.pop(self.answersFile, None)
+            for useMmap in (False, True):
+                compiledDictionaryCache.pop((compiledPathFor(self.answersFile), useMmap), None)
+            letterMatrixCache.pop(self.answersFile, None)
+            for packed in (False, True):
+                wordStoreCache.pop((self.answersFile, packed), None)
+        baseWordTableCache.pop((self.baseFile, self.answersFile), None)
+        self.loaded = False
+        self.indexSize = 0
+        self.tableSize = 0
+        self.compiledSize = 0
+
+    def __repr__(self):
+        return "WordDictionary({!r}, loaded={})".format(self.name, self.loaded)
+
+
+#Class that keeps the registered dictionaries in least recently used order
+class DictionaryRegistry:
+    def __init__(self, memoryBudget=dictionaryMemoryBudget):
+        self.memoryBudget = memoryBudget
+        self.dictionaries = OrderedDict()  # name -> WordDictionary, oldest use first
+        self.lock = threading.Lock()  # the round prefetcher uses it from its own thread
+        self.loads = 0
+        self.evictions = 0
+
+    def register(self, name, baseFile, answersFile=None):
+        if answersFile is None:
+            answersFile = answersFileFor(baseFile)
+        with self.lock:
+            old = self.dictionaries.pop(name, None)
+            if old is not None:
+                old.unload(not self.isShared(old))
+            dictionary = WordDictionary(name, baseFile, answersFile, self)
+            self.dictionaries[name] = dictionary
+        return dictionary
+
+    def unregister(self, name):
+        with self.lock:
+            dictionary = self.dictionaries.pop(name)
+            dictionary.unload(not self.isShared(dictionary))
+
+    def get(self, name):
+        try:
+            return self.dictionaries[name]
+        except KeyError:
+            raise KeyError("no dictionary registered as " + repr(name))
+
+    def names(self):
+        return list(self.dictionaries)
+
+    def use(self, dictionary):
+        with self.lock:
+            if dictionary.name in self.dictionaries:
+                self.dictionaries.move_to_end(dictionary.name)
+            if not dictionary.loaded:
+                dictionary.load()
+                self.loads += 1
+                self.evictOver(dictionary)
+
+    def setMemoryBudget(self, memoryBudget):
+        with self.lock:
+            self.memoryBudget = memoryBudget
+            self.evictOver(None)
+
+    # drops the oldest loaded dictionaries until the total fits, but never
+    # the one being used right now even if it is over the budget by itself
+    def evictOver(self, keep):
+        for dictionary in list(self.dictionaries.values()):
+            if self.memoryUsed() <= self.memoryBudget:
+                break
+            if dictionary is keep or not dictionary.loaded:
+                continue
+            dictionary.unload(not self.isShared(dictionary))
+            self.evictions += 1
+
+    # True if another loaded dictionary uses the same answer list
+    def isShared(self, dictionary):
+        for other in self.dictionaries.values():
+            if other is not dictionary and other.loaded and other.answersFile == dictionary.answersFile:
+                return True
+        return False
+
+    # shared answer indexes (and their compiled lists) are only counted once
+    def memoryUsed(self):
+        total = 0
+        indexSizes = {}
+        for dictionary in self.dictionaries.values():
+            if dictionary.loaded:
+                total += dictionary.tableSize
+                indexSizes[dictionary.answersFile] = dictionary.indexSize + dictionary.compiledSize
+        return total + sum(indexSizes.values())
+
+    def getStats(self):
+        loaded = [name for name, dictionary in self.dictionaries.items() if dictionary.loaded]
+        return {"registered": len(self.dictionaries), "loaded": loaded, "memoryUsed": self.memoryUsed(),
+                "memoryBudget": self.memoryBudget, "loads": self.loads, "evictions": self.evictions}
+
+
+"""
+Compiled dictionary
+    dictionary.bin holds the words of allwords.txt in one binary file so it
+    can be loaded with one read (or mmap) instead of parsing text.
+    Layout, all numbers in little endian:
+        header   magic, version, source hash, list hash, word count, blob size
+        offsets  uint32 x (count + 1), where each word starts in the blob
+        lengths  uint8 x count
+        counts   uint8 x count x 26, how many of each letter a-z the word has
+        blob     all the words back to back (utf-8)
+    A word with letters outside a-z has counts that add up to less than its length.
+"""
+
+compiledMagic = b"TTWD"
+compiledVersion = 1
+compiledHeader = struct.Struct("<4sHH40s40sII")
+
+
+class CompiledDictionary:
+    def __init__(self, buffer, sourceHash, listHash, wordCount, blobSize):
+        self.buffer = buffer
+        self.sourceHash = sourceHash
+        self.listHash = listHash
+        self.wordCount = wordCount
+
+        view = memoryview(buffer)
+        pos = compiledHeader.size
+        offsetBytes = view[pos:pos + 4 * (wordCount + 1)]
+        pos += 4 * (wordCount + 1)
+        if sys.byteorder == "little":
+            self.offsets = offsetBytes.cast("I")
+        else:
+            self.offsets = array("I", offsetBytes)
+            self.offsets.byteswap()
+        self.lengths = view[pos:pos + wordCount]
+        pos += wordCount
+        self.letterCounts = view[pos:pos + wordCount * 26]
+        pos += wordCount * 26
+        self.blob = view[pos:pos + blobSize]
+
+    def __len__(self):
+        return self.wordCount
+
+    def getWord(self, index):
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    # the 26 letter counts of one word
+    def getLetterCounts(self, index):
+        return self.letterCounts[index * 26:(index + 1) * 26]
+
+    def getWords(self):
+        wordList = []
+        for i in range(self.wordCount):
+            wordList.append(self.getWord(i))
+        return wordList
+
+
+# letter a-z counts of a word, case does not matter
+def countLetters(word):
+    counts = bytearray(26)
+    for ch in word.lower():
+        pos = ord(ch) - 97
+        if 0 <= pos < 26:
+            counts[pos] += 1
+    return counts
+
+
+def compileDictionary(wordList, sourceHash, listHash, outPath=compiledDictionaryPath):
+    offsets = array("I", [0])
+    lengths = bytearray()
+    letterCounts = bytearray()
+    blob = bytearray()
+    for word in wordList:
+        blob += word.encode("utf-8")
+        offsets.append(len(blob))
+        lengths.append(min(len(word), 255))
+        letterCounts += countLetters(word)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+
+    header = compiledHeader.pack(compiledMagic, compiledVersion, 0, sourceHash.encode("ascii"),
+                                 listHash.encode("ascii"), len(lengths), len(blob))
+
+    try:
+        writeFileAtomically(outPath, [header, offsets.tobytes(), lengths, letterCounts, blob], "wb")
+    except OSError:
+        print("could not save compiled dictionary,,, check folder")
+
+
+# reads only the header, returns None if the file is missing or not ours
+def readCompiledHeader(path=compiledDictionaryPath):
+    try:
+        f = open(path, "rb")
+        data = f.read(compiledHeader.size)
+        f.close()
+    except OSError:
+        return None
+    if len(data) < compiledHeader.size:
+        return None
+
+    magic, version, pad, sourceHash, listHash, wordCount, blobSize = compiledHeader.unpack(data)
+    if magic != compiledMagic or version != compiledVersion:
+        return None
+    return {"sourceHash": sourceHash.decode("ascii"), "listHash": listHash.decode("ascii"),
+            "wordCount": wordCount, "blobSize": blobSize}
+
+
+# compiles allwords.txt as it is on disk, keeping track of the source hash
+def compileWordListFile(sourceHash, filename=allWordsPath, outPath=compiledDictionaryPath):
     f = open(filename, "r")
-    allLines = f.readlines()
+    wordList = (line.strip() for line in f if line.strip())
+    compileDictionary(wordList, sourceHash, fileHash(filename), outPath)
     f.close()
 
-    for line in allLines:
-        checkWord = line.strip()
 
-        # logic to check length and letters
-        if len(checkWord) >= min_length and checkWord.isalpha():
-            # using my manual check function
-            if manualCheckLetters(base_word, checkWord):
-                resultList.append(checkWord)
+# if the source list changed since the last build, rebuild the word lists
+# so an old allwords.txt does not silently stay around
+def checkSourceIsUnchanged():
+    if not os.path.exists(sourcePath):
+        return
+
+    # source was checked before and was not touched since
+    stamp = fileStamp(sourcePath)
+    if sourceCheckCache.get(sourcePath) == stamp:
+        return
+
+    sourceHash = fileHash(sourcePath)
+    header = readCompiledHeader(compiledDictionaryPath)
+    if header is None:
+        # first build: the lists already there are taken as built from this source
+        if os.path.exists(allWordsPath):
+            compileWordListFile(sourceHash, allWordsPath, compiledDictionaryPath)
+        else:
+            generateWordListsFromSource()
+            sourceCheckCache[sourcePath] = stamp
+            reapplyPatchLog()
+    elif header["sourceHash"] != sourceHash:
+        print("source word list changed.. generating now")
+        generateWordListsFromSource()
+        if os.path.exists(longWordsPath()):
+            generateLongWordLists()
+        # the checked stamp is saved first, patching checks the source again
+        sourceCheckCache[sourcePath] = stamp
+        reapplyPatchLog()
+
+    sourceCheckCache[sourcePath] = stamp
+
+
+# loads dictionary.bin in one read (or mmap), compiling it first if it is
+# missing or older than allwords.txt
+def loadCompiledDictionary(useMmap=False, filename=allWordsPath, path=compiledDictionaryPath):
+    validate_file_name(filename)
+
+    stamp = fileStamp(filename)
+    cached = compiledDictionaryCache.get((path, useMmap))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    listHash = fileHash(filename)
+    header = readCompiledHeader(path)
+    if header is None or header["listHash"] != listHash:
+        sourceHash = ""
+        if header is not None:
+            sourceHash = header["sourceHash"]
+        elif os.path.exists(sourcePath):
+            sourceHash = fileHash(sourcePath)
+        compileWordListFile(sourceHash, filename, path)
+        header = readCompiledHeader(path)
+        if header is None:
+            raise OSError("could not build " + path)
+
+    f = open(path, "rb")
+    if useMmap:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    else:
+        buffer = f.read()
+    f.close()
+
+    compiled = CompiledDictionary(buffer, header["sourceHash"], header["listHash"],
+                                  header["wordCount"], header["blobSize"])
+    compiledDictionaryCache[(path, useMmap)] = (stamp, compiled)
+    return compiled
+
+
+"""
+Batch solver (needs numpy)
+    The dictionary is a words x 26 uint8 matrix of letter counts. A word fits
+    in a base word when none of its counts is bigger than the base word's.
+    To compare all 26 letters in one go, the counts are turned into bit
+    planes: bit (letter) is set when count >= 1, bit (26 + letter) when
+    count >= 2, the next uint64 holds >= 3 and >= 4, and so on. Then a word
+    fits when (word plane & ~base plane) == 0 for every plane, and a whole
+    chunk of base words is checked against every word with broadcasting.
+    Memory is about chunkSize x dictionary size bytes.
+"""
+
+
+def loadNumpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("numpy is needed for generateValidWordsBatch")
+        np = numpy
+    return np
+
+
+# compiled file that goes with a word list file
+def compiledPathFor(filename):
+    if filename == allWordsPath:
+        return compiledDictionaryPath
+    return os.path.splitext(filename)[0] + ".bin"
+
+
+# uint64 bit planes for a count matrix, see above
+def letterBitPlanes(countMatrix, planeCount):
+    letterBits = np.uint64(1) << np.arange(26, dtype=np.uint64)
+    planes = []
+    for plane in range(planeCount):
+        low = ((countMatrix >= 2 * plane + 1) * letterBits).sum(axis=1, dtype=np.uint64)
+        high = ((countMatrix >= 2 * plane + 2) * letterBits).sum(axis=1, dtype=np.uint64)
+        planes.append(low | (high << np.uint64(26)))
+    return planes
+
+
+def loadLetterMatrix(filename=allWordsPath):
+    loadNumpy()
+    compiled = loadCompiledDictionary(filename=filename, path=compiledPathFor(filename))
+    cached = letterMatrixCache.get(filename)
+    if cached is not None and cached[0] is compiled:
+        return cached[1]
+
+    matrix = np.frombuffer(compiled.letterCounts, dtype=np.uint8).reshape(len(compiled), 26)
+    lengths = np.frombuffer(compiled.lengths, dtype=np.uint8)
+    # words with letters outside a-z can never be typed, leave them out
+    usable = matrix.sum(axis=1, dtype=np.int64) == lengths
+    planeCount = (int(matrix.max(initial=0)) + 1) // 2
+    entry = {"matrix": matrix, "lengths": lengths, "usable": usable,
+             "planes": letterBitPlanes(matrix, planeCount), "words": compiled.getWords()}
+    letterMatrixCache[filename] = (compiled, entry)
+    return entry
+
+
+# solves many base words at once, returns (answer lists, answer counts)
+# answers are in file order like generateValidWordsFromBaseWord, but letters
+# are compared without caring about case
+def generateValidWordsBatch(baseWords, min_length=3, chunkSize=512, filename=allWordsPath):
+    loadNumpy()
+    if chunkSize < 1:
+        raise ValueError("chunkSize must be at least 1")
+
+    loaded = loadLetterMatrix(filename)
+    wordList = loaded["words"]
+    wordPlanes = loaded["planes"]
+    candidates = loaded["usable"] & (loaded["lengths"] >= max(min_length, 1))
+
+    answerLists = []
+    answerCounts = []
+    for start in range(0, len(baseWords), chunkSize):
+        chunk = baseWords[start:start + chunkSize]
+        baseMatrix = np.array([countLetters(word) for word in chunk], dtype=np.uint8).reshape(len(chunk), 26)
+        # counts past the planes we have do not matter, no word needs them
+        basePlanes = letterBitPlanes(np.minimum(baseMatrix, 2 * len(wordPlanes)), len(wordPlanes))
+
+        # fits[i, j] is True when word j can be made from base word i
+        fits = np.broadcast_to(candidates, (len(chunk), len(wordList))).copy()
+        for plane in range(len(wordPlanes)):
+            fits &= (wordPlanes[plane][np.newaxis, :] & ~basePlanes[plane][:, np.newaxis]) == 0
+
+        # one nonzero call for the whole chunk, then cut it per base word
+        rows, columns = np.nonzero(fits)
+        rowEnds = np.searchsorted(rows, np.arange(1, len(chunk) + 1))
+        rowStart = 0
+        for rowEnd in rowEnds.tolist():
+            found = []
+            for wordIndex in columns[rowStart:rowEnd].tolist():
+                found.append(wordList[wordIndex])
+            answerLists.append(found)
+            answerCounts.append(len(found))
+            rowStart = rowEnd
+
+    return answerLists, answerCounts
+
+
+"""
+Batch puzzle generator
+    python -m words generate --count N --difficulty HARD --workers K
+    Each worker process loads the index and base word table once, then makes
+    puzzles in batches. Every puzzle is printed as one JSON line with the
+    letters, the sorted answers and how many answers there are per length.
+"""
+
+
+# runs once in every worker process so the files are read one time only
+def initPuzzleWorker():
+    # forked workers start with the same random state, give each its own
+    random.seed()
+    buildSignatureIndex()
+    loadBaseWordTable()
+
+
+def makePuzzle(min_length):
+    baseWord = getBaseWord(min_length)
+    answers = sorted(generateValidWordsFromBaseWord(baseWord, min_length))
+    lengthCounts = {}
+    for word in answers:
+        lengthCounts[str(len(word))] = lengthCounts.get(str(len(word)), 0) + 1
+    # the base word is the longest answer, so hand out its letters mixed up
+    # (random is seeded per batch, the deck stays repeatable)
+    letters = list(baseWord)
+    while True:
+        random.shuffle(letters)
+        if "".join(letters) != baseWord or len(set(baseWord)) < 2:
+            break
+    return {"letters": "".join(letters), "answers": answers, "lengthCounts": lengthCounts}
+
+
+# one job for a worker, the seed makes a batch repeatable
+def makePuzzleBatch(min_length, batchSize, seed=None):
+    if seed is not None:
+        random.seed(seed)
+    puzzles = []
+    for i in range(batchSize):
+        puzzles.append(makePuzzle(min_length))
+    return puzzles
+
+
+def generatePuzzles(count, difficulty="EASY", workers=1, batchSize=64, seed=None):
+    min_length = difficultyMinLength[difficulty]
+
+    jobs = []
+    batchNumber = 0
+    for start in range(0, count, batchSize):
+        batchSeed = None
+        if seed is not None:
+            batchSeed = seed * 1000003 + batchNumber
+        jobs.append((min_length, min(batchSize, count - start), batchSeed))
+        batchNumber += 1
+
+    if workers <= 1:
+        initPuzzleWorker()
+        for job in jobs:
+            for puzzle in makePuzzleBatch(*job):
+                yield puzzle
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=initPuzzleWorker)
+    try:
+        # batches come back in order, each one as soon as it is done
+        for puzzles in pool.map(makePuzzleBatch, *zip(*jobs)):
+            for puzzle in puzzles:
+                yield puzzle
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m words", description="TextTwist word tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="make puzzles as JSON lines")
+    gen.add_argument("--count", type=int, default=10)
+    gen.add_argument("--difficulty", choices=sorted(difficultyMinLength), default="EASY")
+    gen.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    gen.add_argument("--batch-size", type=int, default=64)
+    gen.add_argument("--seed", type=int, default=None)
+    gen.add_argument("--output", default="-", help="file to write, - for stdout")
+
+    footprint = commands.add_parser("footprint", help="memory per word of the word lists")
+    footprint.add_argument("files", nargs="*", help="word lists (default allwords.txt)")
+
+    patch = commands.add_parser("patch", help="add or remove words without a full build")
+    patch.add_argument("--add", nargs="+", default=[], metavar="WORD")
+    patch.add_argument("--remove", nargs="+", default=[], metavar="WORD")
+    patch.add_argument("--compact", action="store_true",
+                       help="fold the patch log into the source list and rebuild everything")
+    patch.add_argument("--verify", action="store_true",
+                       help="check the patched answer indexes against ones built from the new lists")
+
+    args = parser.parse_args(argv)
+    # imported here, both import this module
+    import wordpatch
+    import wordstore
+
+    if args.command == "generate":
+        out = sys.stdout
+        if args.output != "-":
+            out = open(args.output, "w")
+        startTime = time.perf_counter()
+        made = 0
+        for puzzle in generatePuzzles(args.count, args.difficulty, args.workers,
+                                      args.batch_size, args.seed):
+            out.write(json.dumps(puzzle) + "\n")
+            made += 1
+        if out is not sys.stdout:
+            out.close()
+        seconds = max(time.perf_counter() - startTime, 1e-9)
+        print("made " + str(made) + " puzzles, " + str(int(made / seconds)) + " puzzles/sec",
+              file=sys.stderr)
+
+    elif args.command == "footprint":
+        for fileName in args.files or [allWordsPath]:
+            report = wordstore.wordStoreFootprint(fileName)
+            print(report["file"] + ": " + str(report["words"]) + " words")
+            for name in ("listOfStr", "store", "packedStore"):
+                if name in report:
+                    print("    {:<12} {:>10} bytes  {:>7.2f} bytes/word".format(
+                        name, report[name]["bytes"], report[name]["bytesPerWord"]))
+
+    elif args.command == "patch":
+        if args.add or args.remove:
+            if args.verify:
+                # loaded first so there is an index to patch
+                checkSourceIsUnchanged()
+                for fileName, shortest, longest in wordpatch.patchTargets():
+                    if fileName == allWordsPath or fileName == longWordsPath():
+                        buildSignatureIndex(fileName)
+            try:
+                changes = wordpatch.patchDictionary(args.add, args.remove)
+            except ValueError as error:
+                print(error, file=sys.stderr)
+                return 2
+            for fileName, (added, removed) in changes.items():
+                print(os.path.basename(fileName) + ": +" + str(len(added)) + " -" + str(len(removed)))
+                if args.verify and fileName in signatureIndexCache:
+                    same = wordpatch.verifySignatureIndex(signatureIndexCache[fileName][1], fileName)
+                    print("    patched index " + ("matches a rebuilt one" if same else "DIFFERS from a rebuilt one"))
+                    if not same:
+                        return 1
+        if args.compact:
+            try:
+                compacted = wordpatch.compactPatchLog()
+            except (ValueError, OSError) as error:
+                print(error, file=sys.stderr)
+                return 1
+            if compacted:
+                print("lists rebuilt from " + os.path.basename(sourcePath) + " and the patch log, log removed")
+            else:
+                print("patch log is empty")
+    return 0
+
 
-    return resultList
\ No newline at end of file
+if __name__ == "__main__":
+    # wordpatch and wordstore import words, this makes them get this module
+    # and not a second copy with its own paths and caches
+    sys.modules["words"] = sys.modules[__name__]
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import os
+import sys
+from array import array
+from bisect import bisect_left
+
+import words
+
+"""
+Packed word store for the lists made by words.py.
+    A word list as one bytes buffer plus an array of offsets instead of a
+    list of str (about 50 bytes of object overhead per word). Words are
+    kept sorted by length then alphabet, so every length is one slice and
+    membership is a binary search inside it. With packed=True each word is
+    5 bits per letter in one uint64 (up to 12 letters, a-z only); codes of
+    the same length sort like the words, so bisect works on the array as is.
+    No str is made for a lookup, only when a word is read back.
+"""
+
+packedLetterLimit = 12  # 12 x 5 bits fits in 64
+
+
+# a-z (either case) as 1-26, 5 bits each, first letter highest
+def packWord(word):
+    code = 0
+    for ch in word:
+        code = (code << 5) | (ord(ch) & 31)
+    return code
+
+
+def unpackWord(code, length, lowerCase):
+    base = 96 if lowerCase else 64
+    letters = []
+    for i in range(length):
+        letters.append(chr(base + (code & 31)))
+        code >>= 5
+    return "".join(reversed(letters))
+
+
+#Class for a sorted, read-only word list in compact form
+class PackedWordStore:
+    def __init__(self, wordList, packed=False):
+        sortedWords = sorted(set(wordList), key=lambda word: (len(word), word))
+        self.packed = packed
+        self.wordCount = len(sortedWords)
+        self.lowerCase = bool(sortedWords) and sortedWords[0].islower()
+
+        # length -> (first index, end index)
+        self.buckets = {}
+        for i, word in enumerate(sortedWords):
+            first, end = self.buckets.get(len(word), (i, i))
+            self.buckets[len(word)] = (first, i + 1)
+
+        if packed:
+            for word in sortedWords:
+                if (not word.isascii() or not word.isalpha() or len(word) > packedLetterLimit
+                        or word.islower() != self.lowerCase):
+                    raise ValueError("can not pack " + repr(word) + ", only a-z words of one case up to "
+                                     + str(packedLetterLimit) + " letters")
+            self.codes = array("Q", (packWord(word) for word in sortedWords))
+            self.buffer = b""
+            self.offsets = array("I")
+        else:
+            self.codes = array("Q")
+            self.buffer = "".join(sortedWords).encode("utf-8")
+            self.offsets = array("I", [0])
+            position = 0
+            for word in sortedWords:
+                position += len(word.encode("utf-8"))
+                self.offsets.append(position)
+
+    def __len__(self):
+        return self.wordCount
+
+    def getWord(self, index):
+        if self.packed:
+            return unpackWord(self.codes[index], self.lengthAt(index), self.lowerCase)
+        return str(self.buffer[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    # word length at an index, from the buckets (packed words do not store it)
+    def lengthAt(self, index):
+        for length, (first, end) in self.buckets.items():
+            if first <= index < end:
+                return length
+        raise IndexError("word index out of range")
+
+    def __iter__(self):
+        for length in sorted(self.buckets):
+            for word in self.wordsOfLength(length):
+                yield word
+
+    def lengths(self):
+        return sorted(self.buckets)
+
+    # index range of the words of one length
+    def lengthRange(self, length):
+        first, end = self.buckets.get(length, (0, 0))
+        return range(first, end)
+
+    def wordsOfLength(self, length):
+        first, end = self.buckets.get(length, (0, 0))
+        for index in range(first, end):
+            if self.packed:
+                yield unpackWord(self.codes[index], length, self.lowerCase)
+            else:
+                yield str(self.buffer[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    # position of the word, -1 if it is not in the store
+    def indexOf(self, word):
+        bucket = self.buckets.get(len(word))
+        if bucket is None:
+            return -1
+        first, end = bucket
+        if self.packed:
+            if not word.isascii() or not word.isalpha() or word.islower() != self.lowerCase:
+                return -1
+            code = packWord(word)
+            index = bisect_left(self.codes, code, first, end)
+            if index < end and self.codes[index] == code:
+                return index
+            return -1
+
+        # compares bytes slices of the buffer, utf-8 sorts like the str
+        target = word.encode("utf-8")
+        low, high = first, end
+        while low < high:
+            middle = (low + high) // 2
+            if self.buffer[self.offsets[middle]:self.offsets[middle + 1]] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < end and self.buffer[self.offsets[low]:self.offsets[low + 1]] == target:
+            return low
+        return -1
+
+    def __contains__(self, word):
+        return self.indexOf(word) >= 0
+
+    # bytes held by the store: buffers, offsets and the bucket table
+    def memoryBytes(self):
+        size = sys.getsizeof(self.buffer) + sys.getsizeof(self.offsets) + sys.getsizeof(self.codes)
+        return size + words.estimateSize(self.buckets)
+
+    def bytesPerWord(self):
+        return self.memoryBytes() / max(self.wordCount, 1)
+
+
+def loadWordStore(filename=words.allWordsPath, packed=False):
+    words.validate_file_name(filename)
+    stamp = words.fileStamp(filename)
+    cached = words.wordStoreCache.get((filename, packed))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    store = PackedWordStore(words.readWordList(filename), packed)
+    words.wordStoreCache[(filename, packed)] = (stamp, store)
+    return store
+
+
+# bytes per word of a list as list of str, as a store, and as a packed store
+def wordStoreFootprint(filename=words.allWordsPath):
+    wordList = words.readWordList(filename)
+    listBytes = sys.getsizeof(wordList)
+    for word in wordList:
+        listBytes += sys.getsizeof(word)
+    report = {"file": os.path.basename(filename), "words": len(wordList),
+              "listOfStr": {"bytes": listBytes, "bytesPerWord": round(listBytes / max(len(wordList), 1), 2)}}
+    for name, packed in (("store", False), ("packedStore", True)):
+        try:
+            store = PackedWordStore(wordList, packed)
+        except ValueError:
+            continue
+        report[name] = {"bytes": store.memoryBytes(), "bytesPerWord": round(store.bytesPerWord(), 2)}
+    return report